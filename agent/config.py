@@ -3,10 +3,22 @@
 from __future__ import annotations
 
 import os
+import sys
 from dataclasses import dataclass, field
 
+# dataclass(slots=True) is only available on Python 3.10+
+_SLOTS: dict[str, bool] = {"slots": True} if sys.version_info >= (3, 10) else {}
 
-@dataclass
+DEFAULT_SYSTEM_PROMPT = (
+    "You are HackGPT Agent, an expert AI cybersecurity assistant. "
+    "You help security professionals with penetration testing, "
+    "vulnerability analysis, and security research. "
+    "Always provide accurate, educational information. "
+    "Use available tools when they can help answer the question."
+)
+
+
+@dataclass(frozen=True, **_SLOTS)
 class AgentLimits:
     """Per-user rate & budget limits to prevent surprise costs."""
 
@@ -20,7 +32,7 @@ class AgentLimits:
     max_vector_stores_per_user: int = 10
 
 
-@dataclass
+@dataclass(frozen=True, **_SLOTS)
 class AgentConfig:
     """Central configuration for Agent Mode.
 
@@ -50,13 +62,7 @@ class AgentConfig:
     limits: AgentLimits = field(default_factory=AgentLimits)
 
     # ── System prompt ───────────────────────────────────────────────
-    system_prompt: str = (
-        "You are HackGPT Agent, an expert AI cybersecurity assistant. "
-        "You help security professionals with penetration testing, "
-        "vulnerability analysis, and security research. "
-        "Always provide accurate, educational information. "
-        "Use available tools when they can help answer the question."
-    )
+    system_prompt: str = DEFAULT_SYSTEM_PROMPT
 
     @classmethod
     def from_env(cls) -> AgentConfig:
@@ -85,7 +91,7 @@ class AgentConfig:
             image_size=os.getenv("AGENT_IMAGE_SIZE", "auto"),
             voice_model=os.getenv("AGENT_VOICE_MODEL", "gpt-4o-mini-realtime"),
             voice_name=os.getenv("AGENT_VOICE_NAME", "alloy"),
-            system_prompt=os.getenv("AGENT_SYSTEM_PROMPT", cls.system_prompt),
+            system_prompt=os.getenv("AGENT_SYSTEM_PROMPT", DEFAULT_SYSTEM_PROMPT),
             limits=AgentLimits(
                 max_requests_per_minute=_int("AGENT_RATE_LIMIT_RPM", 10),
                 max_requests_per_day=_int("AGENT_RATE_LIMIT_RPD", 500),
@@ -2,12 +2,16 @@
 
 from __future__ import annotations
 
+import sys
 import uuid
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from enum import Enum
 from typing import Any
 
+# Slotted dataclasses for the high-volume records; slots=True needs Python 3.10+
+_SLOTS: dict[str, bool] = {"slots": True} if sys.version_info >= (3, 10) else {}
+
 
 class MessageRole(str, Enum):
     SYSTEM = "system"
@@ -80,7 +84,7 @@ class ToolTrace:
         }
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class AgentMessage:
     """A single message in the agent conversation."""
 
@@ -121,7 +125,7 @@ class AgentMessage:
         }
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class Conversation:
     """Full conversation state."""
 
@@ -157,7 +161,7 @@ class Conversation:
         }
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class UsageRecord:
     """Single usage event for metering and billing."""
 
@@ -187,7 +191,7 @@ class UsageRecord:
         }
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class Workspace:
     """Project workspace with its own knowledge base and settings."""
 
@@ -1,3 +1,146 @@
+import functools
+from unittest.mock import MagicMock, patch
+
+import pytest
+
 # Exclude the standalone installation script from pytest collection.
 # It is designed to run as `python test_installation.py`, not through pytest.
 collect_ignore = ["test_installation.py"]
+
+
+def _quiet_subprocess_run():
+    """Patch hackgpt's subprocess.run so constructors don't probe/install tools."""
+    return patch("hackgpt.subprocess.run", return_value=MagicMock(returncode=0, stdout="", stderr=""))
+
+
+# ---------------------------------------------------------------------------
+# Session-scoped, read-only application objects
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture(scope="session")
+def hackgpt_instance():
+    from hackgpt import HackGPT
+
+    with _quiet_subprocess_run():
+        return HackGPT()
+
+
+@pytest.fixture(scope="session")
+def ai_engine():
+    from hackgpt import AIEngine
+
+    with _quiet_subprocess_run():
+        return AIEngine()
+
+
+@pytest.fixture(scope="session")
+def tool_manager():
+    from hackgpt import ToolManager
+
+    return ToolManager()
+
+
+@pytest.fixture(scope="session")
+def default_config(tmp_path_factory):
+    """hackgpt Config built from a config file that does not exist yet."""
+    from hackgpt import Config
+
+    return Config(config_file=str(tmp_path_factory.mktemp("config") / "hackgpt.ini"))
+
+
+@pytest.fixture(scope="session")
+def enterprise_config():
+    from hackgpt_v2 import Config
+
+    return Config()
+
+
+@pytest.fixture(scope="session")
+def default_agent_config():
+    """Default (frozen) AgentConfig shared by tests that only read it."""
+    from agent.config import AgentConfig
+
+    return AgentConfig()
+
+
+# ---------------------------------------------------------------------------
+# Shared in-memory database
+# ---------------------------------------------------------------------------
+
+_FAST_SQLITE_PRAGMAS = ("synchronous=OFF", "journal_mode=MEMORY", "temp_store=MEMORY", "foreign_keys=OFF")
+
+
+@functools.lru_cache(maxsize=1)
+def _sqlite_schema_script():
+    """CREATE TABLE/INDEX statements for every model, compiled once for SQLite."""
+    from sqlalchemy.dialects import sqlite
+    from sqlalchemy.schema import CreateIndex, CreateTable
+
+    import inventory.models  # noqa: F401  (registers the inventory tables on Base)
+    from database.models import Base
+
+    dialect = sqlite.dialect()
+    statements = []
+    for table in Base.metadata.sorted_tables:
+        statements.append(str(CreateTable(table).compile(dialect=dialect)).strip())
+        statements.extend(str(CreateIndex(index).compile(dialect=dialect)) for index in table.indexes)
+    return ";\n".join(statements) + ";"
+
+
+@pytest.fixture(scope="session")
+def _engine():
+    """One in-memory SQLite database with every table, built once per session."""
+    from sqlalchemy import create_engine, event
+    from sqlalchemy.pool import StaticPool
+
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+
+    # pysqlite defers BEGIN on its own, which breaks SAVEPOINT; let
+    # SQLAlchemy emit it so db_session can roll each test back cleanly.
+    # Durability is irrelevant for a throwaway database, so skip syncing
+    # and keep the journal and temp tables in memory.
+    @event.listens_for(engine, "connect")
+    def _configure_sqlite(dbapi_conn, _record):
+        dbapi_conn.isolation_level = None
+        cursor = dbapi_conn.cursor()
+        for pragma in _FAST_SQLITE_PRAGMAS:
+            cursor.execute(f"PRAGMA {pragma}")
+        cursor.close()
+
+    @event.listens_for(engine, "begin")
+    def _emit_begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
+    raw = engine.raw_connection()
+    try:
+        raw.driver_connection.executescript(_sqlite_schema_script())
+    finally:
+        raw.close()
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db_session(_engine):
+    """Session inside an outer transaction that is rolled back after the test.
+
+    ``commit()`` only releases a SAVEPOINT, so tests can commit freely
+    without leaking rows into the next test.
+    Like DatabaseManager's sessions it does not autoflush, so tests that
+    query pending objects must ``flush()`` (or ``commit()``) first.
+    """
+    from sqlalchemy.orm import Session
+
+    conn = _engine.connect()
+    trans = conn.begin()
+    session = Session(
+        bind=conn,
+        join_transaction_mode="create_savepoint",
+        autoflush=False,
+        expire_on_commit=False,
+    )
+    yield session
+    session.close()
+    trans.rollback()
+    conn.close()
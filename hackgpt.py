@@ -35,7 +35,7 @@ import uuid
 from collections import defaultdict
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
 
 # Load environment variables
 from dotenv import load_dotenv
@@ -349,15 +349,25 @@ class InputValidator:
 
 
 class RateLimiter:
-    """Simple in-memory token-bucket rate limiter."""
-
-    def __init__(self, max_requests: int = 30, window_seconds: int = 60):
+    """Simple in-memory sliding-window rate limiter.
+
+    ``clock`` returns the current time in seconds; tests can pass a fake
+    one to move time forward without sleeping.
+    """
+
+    def __init__(
+        self,
+        max_requests: int = 30,
+        window_seconds: int = 60,
+        clock: Callable[[], float] = time.monotonic,
+    ):
         self.max_requests = max_requests
         self.window = window_seconds
+        self._clock = clock
         self._timestamps: dict[str, list[float]] = defaultdict(list)
 
     def allow(self, key: str = "default") -> bool:
-        now = time.monotonic()
+        now = self._clock()
         # Prune old timestamps
         self._timestamps[key] = [ts for ts in self._timestamps[key] if now - ts < self.window]
         if len(self._timestamps[key]) >= self.max_requests:
@@ -7,18 +7,21 @@ Monitors system and application performance metrics
 from __future__ import annotations
 
 import logging
-import time
+import sys
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
-from threading import Lock, Thread
+from threading import Event, Lock, Thread
 from typing import Any
 
 import psutil
 
+# dataclass(slots=True) is only available on Python 3.10+
+_SLOTS: dict[str, bool] = {"slots": True} if sys.version_info >= (3, 10) else {}
 
-@dataclass
+
+@dataclass(frozen=True, **_SLOTS)
 class PerformanceMetric:
-    """Represents a performance metric"""
+    """Represents a performance metric (immutable, shareable across threads)"""
 
     name: str
     value: float
@@ -30,11 +33,20 @@ class PerformanceMetric:
 class PerformanceMonitor:
     """Monitors system and application performance"""
 
-    def __init__(self, collection_interval: int = 5):
+    def __init__(self, collection_interval: int = 5, max_collection_interval: int = 60):
         self.logger = logging.getLogger(__name__)
         self.collection_interval = collection_interval
+        # Adaptive polling: back off towards max_collection_interval while the system is idle
+        self.max_collection_interval = max(max_collection_interval, collection_interval)
+        self.idle_change_threshold = 2.0  # percentage points
+        self.idle_samples_before_backoff = 3
+        self._current_interval: float = collection_interval
+        self._stable_count = 0
+        self._previous_usage: tuple[float, float] | None = None
+        self._stop = Event()
         self.metrics: list[PerformanceMetric] = []
         self.max_metrics = 1000  # Keep only last 1000 metrics
+        self._latest: dict[str, PerformanceMetric] = {}
         self._lock = Lock()
         self.monitoring = False
         self.monitor_thread: Thread | None = None
@@ -45,6 +57,9 @@ class PerformanceMonitor:
             return
 
         self.monitoring = True
+        self._stop.clear()
+        self._reset_interval()
+        self._previous_usage = None  # don't compare against samples from before a stop
         self.monitor_thread = Thread(target=self._monitor_loop, daemon=True)
         self.monitor_thread.start()
         self.logger.info("Performance monitoring started")
@@ -52,6 +67,7 @@ class PerformanceMonitor:
     def stop_monitoring(self) -> None:
         """Stop performance monitoring"""
         self.monitoring = False
+        self._stop.set()
         if self.monitor_thread:
             self.monitor_thread.join(timeout=5)
         self.logger.info("Performance monitoring stopped")
@@ -61,78 +77,124 @@ class PerformanceMonitor:
         while self.monitoring:
             try:
                 self._collect_system_metrics()
-                time.sleep(self.collection_interval)
+                self._adapt_interval()
             except Exception as e:
                 self.logger.error(f"Error collecting metrics: {e!s}")
-                time.sleep(self.collection_interval)
+                self._reset_interval()
+            self._stop.wait(self._current_interval)
+
+    def _reset_interval(self) -> None:
+        """Return to the base collection cadence"""
+        self._current_interval = self.collection_interval
+        self._stable_count = 0
+
+    def _adapt_interval(self) -> None:
+        """Double the poll interval while CPU and memory usage stay flat"""
+        with self._lock:
+            cpu = self._latest.get("cpu_usage_percent")
+            memory = self._latest.get("memory_usage_percent")
+        if cpu is None or memory is None:
+            return
+
+        usage = (cpu.value, memory.value)
+        previous, self._previous_usage = self._previous_usage, usage
+        if previous is None:
+            return
+
+        if all(abs(now - before) < self.idle_change_threshold for now, before in zip(usage, previous)):
+            self._stable_count += 1
+            if self._stable_count >= self.idle_samples_before_backoff:
+                self._current_interval = min(self._current_interval * 2, self.max_collection_interval)
+        else:
+            self._reset_interval()
 
     def _collect_system_metrics(self) -> None:
         """Collect system performance metrics"""
         timestamp = datetime.now(tz=timezone.utc)
+        batch: list[PerformanceMetric] = []
 
-        # CPU metrics
-        cpu_percent = psutil.cpu_percent(interval=1)
-        self._add_metric("cpu_usage_percent", cpu_percent, "%", timestamp, "system")
-
-        # Memory metrics
-        memory = psutil.virtual_memory()
-        self._add_metric("memory_usage_percent", memory.percent, "%", timestamp, "system")
-        self._add_metric(
-            "memory_available_mb",
-            memory.available / 1024 / 1024,
-            "MB",
-            timestamp,
-            "system",
-        )
-        self._add_metric("memory_used_mb", memory.used / 1024 / 1024, "MB", timestamp, "system")
-
-        # Disk metrics
-        disk = psutil.disk_usage("/")
-        disk_percent = (disk.used / disk.total) * 100
-        self._add_metric("disk_usage_percent", disk_percent, "%", timestamp, "system")
-        self._add_metric("disk_free_gb", disk.free / 1024 / 1024 / 1024, "GB", timestamp, "system")
-
-        # Network metrics
-        try:
-            net_io = psutil.net_io_counters()
-            self._add_metric("network_bytes_sent", net_io.bytes_sent, "bytes", timestamp, "network")
-            self._add_metric("network_bytes_recv", net_io.bytes_recv, "bytes", timestamp, "network")
-        except Exception:
-            pass  # Network metrics might not be available
-
-        # Process metrics for current process
+        # Record whatever was sampled even if a later probe (e.g. disk_usage) raises
         try:
-            process = psutil.Process()
-            self._add_metric(
-                "process_memory_mb",
-                process.memory_info().rss / 1024 / 1024,
-                "MB",
-                timestamp,
-                "process",
+            # CPU metrics
+            cpu_percent = psutil.cpu_percent(interval=1)
+            batch.append(self._make_metric("cpu_usage_percent", cpu_percent, "%", timestamp, "system"))
+
+            # Memory metrics
+            memory = psutil.virtual_memory()
+            batch.append(self._make_metric("memory_usage_percent", memory.percent, "%", timestamp, "system"))
+            batch.append(
+                self._make_metric(
+                    "memory_available_mb",
+                    memory.available / 1024 / 1024,
+                    "MB",
+                    timestamp,
+                    "system",
+                )
             )
-            self._add_metric("process_cpu_percent", process.cpu_percent(), "%", timestamp, "process")
-            self._add_metric(
-                "process_num_threads",
-                process.num_threads(),
-                "count",
-                timestamp,
-                "process",
-            )
-        except Exception:
-            pass  # Process metrics might not be available
+            batch.append(self._make_metric("memory_used_mb", memory.used / 1024 / 1024, "MB", timestamp, "system"))
+
+            # Disk metrics
+            disk = psutil.disk_usage("/")
+            disk_percent = (disk.used / disk.total) * 100
+            batch.append(self._make_metric("disk_usage_percent", disk_percent, "%", timestamp, "system"))
+            batch.append(self._make_metric("disk_free_gb", disk.free / 1024 / 1024 / 1024, "GB", timestamp, "system"))
 
-    def _add_metric(
-        self,
+            # Network metrics
+            try:
+                net_io = psutil.net_io_counters()
+                batch.append(self._make_metric("network_bytes_sent", net_io.bytes_sent, "bytes", timestamp, "network"))
+                batch.append(self._make_metric("network_bytes_recv", net_io.bytes_recv, "bytes", timestamp, "network"))
+            except Exception:
+                pass  # Network metrics might not be available
+
+            # Process metrics for current process
+            try:
+                process = psutil.Process()
+                batch.append(
+                    self._make_metric(
+                        "process_memory_mb",
+                        process.memory_info().rss / 1024 / 1024,
+                        "MB",
+                        timestamp,
+                        "process",
+                    )
+                )
+                batch.append(self._make_metric("process_cpu_percent", process.cpu_percent(), "%", timestamp, "process"))
+                batch.append(
+                    self._make_metric(
+                        "process_num_threads",
+                        process.num_threads(),
+                        "count",
+                        timestamp,
+                        "process",
+                    )
+                )
+            except Exception:
+                pass  # Process metrics might not be available
+
+        finally:
+            self._add_metrics(batch)
+
+    @staticmethod
+    def _make_metric(
         name: str,
         value: float,
         unit: str,
         timestamp: datetime,
         category: str = "general",
-    ) -> None:
-        """Add a metric to the collection"""
+    ) -> PerformanceMetric:
+        """Build a metric without touching shared state"""
+        return PerformanceMetric(name, value, unit, timestamp, category)
+
+    def _add_metrics(self, batch: list[PerformanceMetric]) -> None:
+        """Add a batch of metrics under a single lock acquisition"""
+        if not batch:
+            return
+
         with self._lock:
-            metric = PerformanceMetric(name, value, unit, timestamp, category)
-            self.metrics.append(metric)
+            self.metrics.extend(batch)
+            for metric in batch:
+                self._latest[metric.name] = metric
 
             # Keep only the most recent metrics
             if len(self.metrics) > self.max_metrics:
@@ -141,21 +203,20 @@ class PerformanceMonitor:
     def get_current_metrics(self) -> dict[str, Any]:
         """Get current performance metrics"""
         with self._lock:
-            if not self.metrics:
-                return {}
-
-            # Get the most recent metrics
-            latest_metrics = {}
-            for metric in reversed(self.metrics):
-                if metric.name not in latest_metrics:
-                    latest_metrics[metric.name] = {
-                        "value": metric.value,
-                        "unit": metric.unit,
-                        "timestamp": metric.timestamp.isoformat(),
-                        "category": metric.category,
-                    }
-
-            return latest_metrics
+            return {
+                name: {
+                    "value": metric.value,
+                    "unit": metric.unit,
+                    "timestamp": metric.timestamp.isoformat(),
+                    "category": metric.category,
+                }
+                for name, metric in self._latest.items()
+            }
+
+    def _values(self) -> dict[str, float]:
+        """Snapshot the latest value of every metric as a flat name -> value map"""
+        with self._lock:
+            return {name: metric.value for name, metric in self._latest.items()}
 
     def get_metrics_history(self, metric_name: str, minutes: int = 60) -> list[dict[str, Any]]:
         """Get historical data for a specific metric"""
@@ -176,30 +237,30 @@ class PerformanceMonitor:
 
     def get_system_summary(self) -> dict[str, Any]:
         """Get system performance summary"""
-        current = self.get_current_metrics()
+        values = self._values()
 
         return {
             "timestamp": datetime.now(tz=timezone.utc).isoformat(),
             "system": {
-                "cpu_usage": current.get("cpu_usage_percent", {}).get("value", 0),
-                "memory_usage": current.get("memory_usage_percent", {}).get("value", 0),
-                "disk_usage": current.get("disk_usage_percent", {}).get("value", 0),
-                "memory_available_mb": current.get("memory_available_mb", {}).get("value", 0),
+                "cpu_usage": values.get("cpu_usage_percent", 0),
+                "memory_usage": values.get("memory_usage_percent", 0),
+                "disk_usage": values.get("disk_usage_percent", 0),
+                "memory_available_mb": values.get("memory_available_mb", 0),
             },
             "process": {
-                "memory_mb": current.get("process_memory_mb", {}).get("value", 0),
-                "cpu_percent": current.get("process_cpu_percent", {}).get("value", 0),
-                "num_threads": current.get("process_num_threads", {}).get("value", 0),
+                "memory_mb": values.get("process_memory_mb", 0),
+                "cpu_percent": values.get("process_cpu_percent", 0),
+                "num_threads": values.get("process_num_threads", 0),
             },
         }
 
     def get_alerts(self) -> list[dict[str, Any]]:
         """Check for performance alerts"""
         alerts = []
-        current = self.get_current_metrics()
+        values = self._values()
 
         # CPU alert
-        cpu_usage = current.get("cpu_usage_percent", {}).get("value", 0)
+        cpu_usage = values.get("cpu_usage_percent", 0)
         if cpu_usage > 90:
             alerts.append(
                 {
@@ -222,7 +283,7 @@ class PerformanceMonitor:
             )
 
         # Memory alert
-        memory_usage = current.get("memory_usage_percent", {}).get("value", 0)
+        memory_usage = values.get("memory_usage_percent", 0)
         if memory_usage > 90:
             alerts.append(
                 {
@@ -245,7 +306,7 @@ class PerformanceMonitor:
             )
 
         # Disk alert
-        disk_usage = current.get("disk_usage_percent", {}).get("value", 0)
+        disk_usage = values.get("disk_usage_percent", 0)
         if disk_usage > 95:
             alerts.append(
                 {
@@ -271,15 +332,22 @@ class PerformanceMonitor:
 
 
 # Global performance monitor instance
-_performance_monitor = None
+_performance_monitor: PerformanceMonitor | None = None
+_performance_monitor_lock = Lock()
 
 
 def get_performance_monitor() -> PerformanceMonitor:
     """Get singleton performance monitor instance"""
     global _performance_monitor
-    if _performance_monitor is None:
-        _performance_monitor = PerformanceMonitor()
-    return _performance_monitor
+    monitor = _performance_monitor
+    if monitor is None:
+        # Double-checked locking: only the cold path pays for the lock
+        with _performance_monitor_lock:
+            monitor = _performance_monitor
+            if monitor is None:
+                monitor = PerformanceMonitor()
+                _performance_monitor = monitor
+    return monitor
 
 
 # Alias for backwards compatibility
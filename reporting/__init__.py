@@ -1,9 +1,16 @@
+import functools
+
 from .dynamic_reports import ChartGenerator, DynamicReportGenerator, ReportTemplate
 from .realtime_dashboard import RealTimeDashboard
 
 
+@functools.lru_cache(maxsize=1)
 def get_realtime_dashboard():
-    """Initialize and return the real-time dashboard"""
+    """Initialize and return the shared real-time dashboard
+
+    The instance is created on first use and reused afterwards; call
+    ``get_realtime_dashboard.cache_clear()`` to drop it (e.g. on teardown).
+    """
     return RealTimeDashboard()
 
 
@@ -4,12 +4,21 @@ Unrestricted File System Access Module for HackGPT
 Bypasses all file system restrictions for complete access
 """
 
+import errno
 import os
 import shutil
+import signal
 import stat
 import logging
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Union, List, Optional
+from typing import Iterator, Union, List, Optional
+
+# stat() errors meaning the path does not exist (mirrors Path.exists())
+_MISSING_ERRNOS = frozenset({errno.ENOENT, errno.ENOTDIR, errno.EBADF, errno.ELOOP})
+
+# World read/write/execute bits applied in DANGEROUS_OPERATIONS mode
+_ALL_RWX = stat.S_IRWXU | stat.S_IRWXG | stat.S_IRWXO
 
 
 class UnrestrictedFileSystem:
@@ -19,14 +28,20 @@ class UnrestrictedFileSystem:
         self.logger = logging.getLogger(__name__)
         self.FILESYSTEM_BYPASS = os.getenv("FILESYSTEM_BYPASS", "false").lower() == "true"
         self.DANGEROUS_OPERATIONS = os.getenv("DANGEROUS_OPERATIONS", "false").lower() == "true"
+        self._all_rwx = _ALL_RWX
         
         if self.FILESYSTEM_BYPASS:
             self.logger.warning("🚨 FILESYSTEM BYPASS MODE: All file system restrictions disabled!")
     
+    @staticmethod
+    def _p(file_path: Union[str, Path]) -> Path:
+        """Coerce to Path, skipping the allocation when already given one"""
+        return file_path if isinstance(file_path, Path) else Path(file_path)
+    
     def read_file(self, file_path: Union[str, Path], binary: bool = False) -> bytes:
         """Read any file on the system, bypassing all restrictions"""
         try:
-            path = Path(file_path)
+            path = self._p(file_path)
             if binary:
                 return path.read_bytes()
             else:
@@ -38,7 +53,7 @@ class UnrestrictedFileSystem:
     def write_file(self, file_path: Union[str, Path], content: Union[str, bytes], binary: bool = False):
         """Write to any file on the system, bypassing all restrictions"""
         try:
-            path = Path(file_path)
+            path = self._p(file_path)
             # Create parent directories if they don't exist
             path.parent.mkdir(parents=True, exist_ok=True)
             
@@ -49,7 +64,7 @@ class UnrestrictedFileSystem:
             
             # Make file world-readable/writable if in dangerous mode
             if self.DANGEROUS_OPERATIONS:
-                os.chmod(path, stat.S_IRWXU | stat.S_IRWXG | stat.S_IRWXO)
+                os.chmod(path, self._all_rwx)
                 
         except Exception as e:
             self.logger.error(f"Failed to write {file_path}: {e}")
@@ -58,7 +73,7 @@ class UnrestrictedFileSystem:
     def delete_file(self, file_path: Union[str, Path], force: bool = True):
         """Delete any file on the system, bypassing all restrictions"""
         try:
-            path = Path(file_path)
+            path = self._p(file_path)
             if path.exists():
                 if path.is_dir():
                     shutil.rmtree(path, ignore_errors=force)
@@ -69,29 +84,72 @@ class UnrestrictedFileSystem:
             raise
     
     def execute_command(self, command: str, shell: bool = True, cwd: Optional[str] = None) -> str:
-        """Execute system commands with full privileges"""
+        """Execute system commands with full privileges and return the buffered stdout"""
         import subprocess
         
-        try:
-            result = subprocess.run(
-                command,
-                shell=shell,
-                cwd=cwd,
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            return result.stdout
-        except subprocess.CalledProcessError as e:
-            error_msg = f"Command failed: {e.cmd}\nError: {e.stderr}"
+        with subprocess.Popen(
+            command,
+            shell=shell,
+            cwd=cwd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True
+        ) as proc:
+            stdout, stderr = proc.communicate()
+        
+        if proc.returncode != 0:
+            error_msg = f"Command failed: {command}\nError: {stderr}"
+            self.logger.error(error_msg)
+            raise RuntimeError(error_msg)
+        return stdout
+    
+    def execute_command_stream(self, command: str, shell: bool = True, cwd: Optional[str] = None) -> Iterator[str]:
+        """Execute system commands and yield stdout line by line as it is produced
+        
+        Avoids buffering the full output of long-running tools in memory. Note that
+        shell=True with untrusted input remains a command-injection risk.
+        """
+        import subprocess
+        import tempfile
+        
+        # stderr goes to a spill file so a chatty tool cannot fill the pipe and stall stdout
+        with tempfile.TemporaryFile(mode="w+") as stderr_file, subprocess.Popen(
+            command,
+            shell=shell,
+            cwd=cwd,
+            stdout=subprocess.PIPE,
+            stderr=stderr_file,
+            text=True,
+            bufsize=1,
+            start_new_session=True
+        ) as proc:
+            assert proc.stdout is not None
+            try:
+                yield from proc.stdout
+            except BaseException:
+                # Caller stopped early (break/close()); Popen.__exit__ would otherwise
+                # wait for a long-running tool to finish on its own. Kill the whole
+                # session's process group so the tool dies too, not just the shell.
+                if proc.poll() is None:
+                    try:
+                        os.killpg(proc.pid, signal.SIGKILL)
+                    except ProcessLookupError:
+                        pass  # Exited between poll() and killpg()
+                raise
+            proc.wait()
+            stderr_file.seek(0)
+            stderr = stderr_file.read()
+        
+        if proc.returncode != 0:
+            error_msg = f"Command failed: {command}\nError: {stderr}"
             self.logger.error(error_msg)
             raise RuntimeError(error_msg)
     
     def copy_file(self, source: Union[str, Path], destination: Union[str, Path], overwrite: bool = True):
         """Copy files between any locations on the system"""
         try:
-            source_path = Path(source)
-            dest_path = Path(destination)
+            source_path = self._p(source)
+            dest_path = self._p(destination)
             
             # Create parent directory if it doesn't exist
             dest_path.parent.mkdir(parents=True, exist_ok=True)
@@ -106,11 +164,11 @@ class UnrestrictedFileSystem:
                 if dest_path.is_dir():
                     for root, dirs, files in os.walk(dest_path):
                         for d in dirs:
-                            os.chmod(os.path.join(root, d), stat.S_IRWXU | stat.S_IRWXG | stat.S_IRWXO)
+                            os.chmod(os.path.join(root, d), self._all_rwx)
                         for f in files:
-                            os.chmod(os.path.join(root, f), stat.S_IRWXU | stat.S_IRWXG | stat.S_IRWXO)
+                            os.chmod(os.path.join(root, f), self._all_rwx)
                 else:
-                    os.chmod(dest_path, stat.S_IRWXU | stat.S_IRWXG | stat.S_IRWXO)
+                    os.chmod(dest_path, self._all_rwx)
                     
         except Exception as e:
             self.logger.error(f"Failed to copy {source} to {destination}: {e}")
@@ -119,7 +177,7 @@ class UnrestrictedFileSystem:
     def list_directory(self, directory_path: Union[str, Path], recursive: bool = False) -> List[str]:
         """List contents of any directory on the system"""
         try:
-            path = Path(directory_path)
+            path = self._p(directory_path)
             if not path.exists():
                 return []
             
@@ -135,7 +193,7 @@ class UnrestrictedFileSystem:
     def change_permissions(self, path: Union[str, Path], mode: int):
         """Change permissions on any file or directory"""
         try:
-            file_path = Path(path)
+            file_path = self._p(path)
             if file_path.is_dir():
                 # Recursively change permissions on directory
                 for root, dirs, files in os.walk(file_path):
@@ -152,7 +210,7 @@ class UnrestrictedFileSystem:
     def change_ownership(self, path: Union[str, Path], uid: int, gid: int):
         """Change ownership of any file or directory (requires root)"""
         try:
-            file_path = Path(path)
+            file_path = self._p(path)
             if file_path.is_dir():
                 # Recursively change ownership on directory
                 for root, dirs, files in os.walk(file_path):
@@ -169,8 +227,8 @@ class UnrestrictedFileSystem:
     def create_symlink(self, source: Union[str, Path], link_name: Union[str, Path], overwrite: bool = True):
         """Create symbolic links anywhere on the system"""
         try:
-            source_path = Path(source)
-            link_path = Path(link_name)
+            source_path = self._p(source)
+            link_path = self._p(link_name)
             
             # Remove existing symlink if it exists
             if link_path.exists() and overwrite:
@@ -185,24 +243,32 @@ class UnrestrictedFileSystem:
     def get_file_info(self, file_path: Union[str, Path]) -> dict:
         """Get detailed information about any file"""
         try:
-            path = Path(file_path)
-            if not path.exists():
+            path = self._p(file_path)
+            try:
+                # A single stat() serves the existence check and every field below
+                stat_info = path.stat()
+            except OSError as e:
+                # Same errors Path.exists() treats as "does not exist"
+                if e.errno in _MISSING_ERRNOS:
+                    return {"exists": False}
+                raise
+            except ValueError:
+                # e.g. an embedded NUL byte; Path.exists() reports these as missing too
                 return {"exists": False}
-                
-            stat_info = path.stat()
+            mode = stat_info.st_mode
             
             return {
                 "exists": True,
                 "path": str(path.absolute()),
                 "size": stat_info.st_size,
-                "created": datetime.fromtimestamp(stat_info.st_ctime),
-                "modified": datetime.fromtimestamp(stat_info.st_mtime),
-                "accessed": datetime.fromtimestamp(stat_info.st_atime),
-                "mode": oct(stat_info.st_mode),
+                "created": datetime.fromtimestamp(stat_info.st_ctime, tz=timezone.utc).isoformat(),
+                "modified": datetime.fromtimestamp(stat_info.st_mtime, tz=timezone.utc).isoformat(),
+                "accessed": datetime.fromtimestamp(stat_info.st_atime, tz=timezone.utc).isoformat(),
+                "mode": oct(mode),
                 "uid": stat_info.st_uid,
                 "gid": stat_info.st_gid,
-                "is_file": path.is_file(),
-                "is_dir": path.is_dir(),
+                "is_file": stat.S_ISREG(mode),
+                "is_dir": stat.S_ISDIR(mode),
                 "is_symlink": path.is_symlink(),
                 "readable": os.access(path, os.R_OK),
                 "writable": os.access(path, os.W_OK),
@@ -2,16 +2,35 @@
 
 from __future__ import annotations
 
+import time
 from unittest.mock import MagicMock, patch
 
 import pytest
+from flask import Flask
 
+import agent.api as api_module
+from agent.api import agent_bp
+from agent.config import AgentConfig, AgentLimits
+from agent.metering import UsageMeter
+from agent.orchestrator import AgentOrchestrator
+from agent.schemas import AgentMessage, Conversation, MessageRole, UsageRecord, Workspace, estimate_cost
+from agent.tools import build_file_search_tool, build_tool_list, is_tool_allowed
+from agent.vector_store import VectorStoreManager
 
-class TestAgentConfig:
-    def test_default_config(self):
-        from agent.config import AgentConfig
+# Pre-built vector-store stand-ins, keyed by the suffix of their id
+_VS_MOCKS = {suffix: MagicMock(id=f"vs_{suffix}") for suffix in ("abc123", "abc", "x", "1", "2")}
+
+
+def _rec(**overrides):
+    """UsageRecord for user u1 on gpt-4o, with any field overridden."""
+    fields = {"user_id": "u1", "model": "gpt-4o"}
+    fields.update(overrides)
+    return UsageRecord(**fields)
 
-        cfg = AgentConfig()
+
+class TestAgentConfig:
+    def test_default_config(self, default_agent_config):
+        cfg = default_agent_config
         assert cfg.default_model == "gpt-4o"
         assert cfg.enable_web_search is False
         assert cfg.enable_code_interpreter is False
@@ -19,8 +38,6 @@ class TestAgentConfig:
         assert cfg.enable_image_generation is False
 
     def test_from_env(self, monkeypatch):
-        from agent.config import AgentConfig
-
         monkeypatch.setenv("AGENT_ENABLE_WEB_SEARCH", "true")
         monkeypatch.setenv("AGENT_MODEL", "gpt-4.1-mini")
         monkeypatch.setenv("AGENT_RATE_LIMIT_RPM", "42")
@@ -30,8 +47,6 @@ class TestAgentConfig:
         assert cfg.limits.max_requests_per_minute == 42
 
     def test_from_env_defaults(self, monkeypatch):
-        from agent.config import AgentConfig
-
         for key in (
             "AGENT_ENABLE_WEB_SEARCH",
             "AGENT_ENABLE_CODE_INTERPRETER",
@@ -45,8 +60,6 @@ class TestAgentConfig:
         assert cfg.enable_web_search is False
 
     def test_limits_dataclass(self):
-        from agent.config import AgentLimits
-
         lim = AgentLimits(max_requests_per_minute=5, max_requests_per_day=100)
         assert lim.max_requests_per_minute == 5
         assert lim.max_requests_per_day == 100
@@ -55,22 +68,16 @@ class TestAgentConfig:
 
 class TestSchemas:
     def test_message_role_values(self):
-        from agent.schemas import MessageRole
-
         assert MessageRole.USER == "user"
         assert MessageRole.ASSISTANT == "assistant"
 
     def test_agent_message_defaults(self):
-        from agent.schemas import AgentMessage, MessageRole
-
         msg = AgentMessage(role=MessageRole.USER, content="hello")
         assert msg.citations == []
         assert msg.images == []
         assert msg.tool_traces == []
 
     def test_conversation_creation(self):
-        from agent.schemas import Conversation
-
         conv = Conversation(user_id="u1")
         assert conv.id
         assert conv.title == "New Chat"
@@ -79,34 +86,20 @@ class TestSchemas:
         assert conv.messages == []
 
     def test_estimate_cost(self):
-        from agent.schemas import estimate_cost
-
         cost = estimate_cost("gpt-4o", 1000, 500)
         assert cost > 0
 
     def test_estimate_cost_unknown_model(self):
-        from agent.schemas import estimate_cost
-
         cost = estimate_cost("no-such-model", 100, 50)
         assert cost > 0
 
     def test_workspace_creation(self):
-        from agent.schemas import Workspace
-
         ws = Workspace(user_id="u1", name="test-ws")
         assert ws.id
         assert ws.files == []
 
     def test_usage_record_to_dict(self):
-        from agent.schemas import UsageRecord
-
-        rec = UsageRecord(
-            user_id="u1",
-            model="gpt-4o",
-            input_tokens=100,
-            output_tokens=50,
-            total_tokens=150,
-        )
+        rec = _rec(input_tokens=100, output_tokens=50, total_tokens=150)
         d = rec.to_dict()
         assert d["user_id"] == "u1"
         assert d["total_tokens"] == 150
@@ -114,19 +107,8 @@ class TestSchemas:
 
 class TestMetering:
     def test_record_and_query(self):
-        from agent.config import AgentLimits
-        from agent.metering import UsageMeter
-        from agent.schemas import UsageRecord
-
         meter = UsageMeter(AgentLimits(max_requests_per_minute=100, max_requests_per_day=1000))
-        rec = UsageRecord(
-            user_id="u1",
-            model="gpt-4o",
-            input_tokens=100,
-            output_tokens=50,
-            total_tokens=150,
-            estimated_cost_usd=0.001,
-        )
+        rec = _rec(input_tokens=100, output_tokens=50, total_tokens=150, estimated_cost_usd=0.001)
         meter.record_usage(rec)
         usage = meter.get_user_usage("u1")
         assert usage["daily_requests"] == 1
@@ -134,34 +116,25 @@ class TestMetering:
         assert usage["daily_cost_usd"] > 0
 
     def test_rate_limit_check(self):
-        from agent.config import AgentLimits
-        from agent.metering import UsageMeter
-        from agent.schemas import UsageRecord
-
-        meter = UsageMeter(AgentLimits(max_requests_per_minute=2, max_requests_per_day=1000))
+        meter = UsageMeter(AgentLimits(max_requests_per_minute=5, max_requests_per_day=1000))
         assert meter.check_rate_limit("u1") is None
-        meter.record_usage(UsageRecord(user_id="u1", model="gpt-4o", total_tokens=10))
+        # Fill the window to one below the limit, then let a real request tip it over
+        meter._buckets["u1"].request_timestamps.extend([time.time()] * 4)
         assert meter.check_rate_limit("u1") is None
-        meter.record_usage(UsageRecord(user_id="u1", model="gpt-4o", total_tokens=10))
+        meter.record_usage(_rec(total_tokens=10))
         result = meter.check_rate_limit("u1")
         assert result is not None
         assert "Rate limit" in result
 
     def test_token_budget_check(self):
-        from agent.config import AgentLimits
-        from agent.metering import UsageMeter
-        from agent.schemas import UsageRecord
-
         meter = UsageMeter(AgentLimits(max_tokens_per_day=200))
-        meter.record_usage(UsageRecord(user_id="u1", model="gpt-4o", total_tokens=180))
+        meter._get_bucket("u1").daily_tokens = 180
+        assert meter.check_token_budget("u1", estimated_tokens=20) is None
         result = meter.check_token_budget("u1", estimated_tokens=50)
         assert result is not None
         assert "token" in result.lower()
 
     def test_image_budget_check(self):
-        from agent.config import AgentLimits
-        from agent.metering import UsageMeter
-
         meter = UsageMeter(AgentLimits(max_image_generations_per_day=1))
         meter.record_image_generation("u1")
         result = meter.check_image_budget("u1")
@@ -169,9 +142,6 @@ class TestMetering:
         assert "image" in result.lower()
 
     def test_fresh_user_no_limits(self):
-        from agent.config import AgentLimits
-        from agent.metering import UsageMeter
-
         meter = UsageMeter(AgentLimits())
         usage = meter.get_user_usage("brand_new_user")
         assert usage["daily_requests"] == 0
@@ -179,42 +149,24 @@ class TestMetering:
 
 
 class TestTools:
-    def test_build_empty(self):
-        from agent.config import AgentConfig
-        from agent.tools import build_tool_list
-
-        cfg = AgentConfig()
-        tools = build_tool_list(cfg)
+    def test_build_empty(self, default_agent_config):
+        tools = build_tool_list(default_agent_config)
         assert tools == []
 
-    def test_build_web_search(self):
-        from agent.config import AgentConfig
-        from agent.tools import build_tool_list
-
-        cfg = AgentConfig(enable_web_search=True)
+    @pytest.mark.parametrize(
+        ("flag", "expected_type"),
+        [
+            ("enable_web_search", "web_search_preview"),
+            ("enable_code_interpreter", "code_interpreter"),
+            ("enable_image_generation", "image_generation"),
+        ],
+    )
+    def test_build_enabled_tool(self, flag, expected_type):
+        cfg = AgentConfig(**{flag: True})
         tools = build_tool_list(cfg)
-        assert any(t.get("type") == "web_search_preview" for t in tools)
-
-    def test_build_code_interpreter(self):
-        from agent.config import AgentConfig
-        from agent.tools import build_tool_list
-
-        cfg = AgentConfig(enable_code_interpreter=True)
-        tools = build_tool_list(cfg)
-        assert any(t.get("type") == "code_interpreter" for t in tools)
-
-    def test_build_image_generation(self):
-        from agent.config import AgentConfig
-        from agent.tools import build_tool_list
-
-        cfg = AgentConfig(enable_image_generation=True)
-        tools = build_tool_list(cfg)
-        assert any(t.get("type") == "image_generation" for t in tools)
+        assert any(t.get("type") == expected_type for t in tools)
 
     def test_override_disables_tool(self):
-        from agent.config import AgentConfig
-        from agent.tools import build_tool_list
-
         cfg = AgentConfig(enable_web_search=True, enable_code_interpreter=True)
         tools = build_tool_list(cfg, overrides={"web_search": False})
         types = [t.get("type") for t in tools]
@@ -222,123 +174,97 @@ class TestTools:
         assert "code_interpreter" in types
 
     def test_override_cannot_enable_disabled(self):
-        from agent.config import AgentConfig
-        from agent.tools import build_tool_list
-
         cfg = AgentConfig(enable_web_search=False)
         tools = build_tool_list(cfg, overrides={"web_search": True})
         assert tools == []
 
     def test_build_file_search_tool(self):
-        from agent.tools import build_file_search_tool
-
         tool = build_file_search_tool(["vs_123", "vs_456"])
         assert tool["type"] == "file_search"
         assert len(tool["vector_store_ids"]) == 2
 
     def test_is_tool_allowed(self):
-        from agent.tools import is_tool_allowed
-
         assert is_tool_allowed("web_search_preview") is True
         assert is_tool_allowed("code_interpreter") is True
         assert is_tool_allowed("evil_tool") is False
 
 
 class TestVectorStoreManager:
-    def _make_manager(self):
-        from agent.config import AgentConfig
-        from agent.vector_store import VectorStoreManager
-
+    @pytest.fixture(scope="class")
+    def vs_manager(self, default_agent_config):
         mock_client = MagicMock()
-        cfg = AgentConfig()
-        mgr = VectorStoreManager(cfg, mock_client)
-        return mgr, mock_client
-
-    def test_create_workspace(self):
-        mgr, client = self._make_manager()
-        mock_vs = MagicMock()
-        mock_vs.id = "vs_abc123"
-        client.create_vector_store.return_value = mock_vs
+        return VectorStoreManager(default_agent_config, mock_client), mock_client
+
+    @pytest.fixture(autouse=True)
+    def _reset_manager(self, vs_manager):
+        mgr, client = vs_manager
+        mgr._workspaces.clear()
+        client.reset_mock(return_value=True, side_effect=True)
+
+    def test_create_workspace(self, vs_manager):
+        mgr, client = vs_manager
+        client.create_vector_store.return_value = _VS_MOCKS["abc123"]
         ws = mgr.create_workspace("My Project", "u1")
         assert ws.name == "My Project"
         assert ws.vector_store_id == "vs_abc123"
         assert ws.user_id == "u1"
 
-    def test_delete_workspace(self):
-        mgr, client = self._make_manager()
-        mock_vs = MagicMock()
-        mock_vs.id = "vs_abc"
-        client.create_vector_store.return_value = mock_vs
+    def test_delete_workspace(self, vs_manager):
+        mgr, client = vs_manager
+        client.create_vector_store.return_value = _VS_MOCKS["abc"]
         ws = mgr.create_workspace("temp", "u1")
         mgr.delete_workspace(ws.id)
         client.delete_vector_store.assert_called_once_with("vs_abc")
 
-    def test_upload_file_bad_extension(self):
-        mgr, _ = self._make_manager()
-        mock_vs = MagicMock()
-        mock_vs.id = "vs_x"
-        mgr.client.create_vector_store.return_value = mock_vs
+    def test_upload_file_bad_extension(self, vs_manager):
+        mgr, _ = vs_manager
+        mgr.client.create_vector_store.return_value = _VS_MOCKS["x"]
         ws = mgr.create_workspace("ws", "u1")
         with pytest.raises(ValueError, match="not allowed"):
             mgr.upload_file(ws.id, b"data", "malware.exe")
 
-    def test_list_workspaces_filters_by_user(self):
-        mgr, client = self._make_manager()
-        mock_vs = MagicMock()
-        mock_vs.id = "vs_1"
-        client.create_vector_store.return_value = mock_vs
+    def test_list_workspaces_filters_by_user(self, vs_manager):
+        mgr, client = vs_manager
+        client.create_vector_store.side_effect = [_VS_MOCKS["1"], _VS_MOCKS["2"]]
         mgr.create_workspace("ws1", "u1")
-        mock_vs2 = MagicMock()
-        mock_vs2.id = "vs_2"
-        client.create_vector_store.return_value = mock_vs2
         mgr.create_workspace("ws2", "u2")
         u1_ws = [w for w in mgr._workspaces.values() if w.user_id == "u1"]
         assert len(u1_ws) == 1
 
-    def test_get_workspace(self):
-        mgr, client = self._make_manager()
-        mock_vs = MagicMock()
-        mock_vs.id = "vs_1"
-        client.create_vector_store.return_value = mock_vs
+    def test_get_workspace(self, vs_manager):
+        mgr, client = vs_manager
+        client.create_vector_store.return_value = _VS_MOCKS["1"]
         ws = mgr.create_workspace("ws1", "u1")
         assert mgr.get_workspace(ws.id) is not None
         assert mgr.get_workspace("nonexistent") is None
 
 
 class TestOrchestrator:
-    def _make_orchestrator(self):
-        from agent.config import AgentConfig
-        from agent.orchestrator import AgentOrchestrator
-
-        cfg = AgentConfig()
+    @pytest.fixture(scope="class")
+    def orch(self, default_agent_config):
         with patch("agent.orchestrator.OpenAIClient"), patch("agent.orchestrator.UsageMeter"):
-            return AgentOrchestrator(cfg)
+            yield AgentOrchestrator(default_agent_config)
+
+    @pytest.fixture(autouse=True)
+    def _reset_conversations(self, orch):
+        orch._conversations.clear()
 
-    def test_list_conversations_empty(self):
-        orch = self._make_orchestrator()
+    def test_list_conversations_empty(self, orch):
         assert orch.list_conversations("u1") == []
 
-    def test_get_nonexistent_conversation(self):
-        orch = self._make_orchestrator()
+    def test_get_nonexistent_conversation(self, orch):
         assert orch.get_conversation("no-such-id") is None
 
-    def test_delete_conversation(self):
-        from agent.schemas import Conversation
-
-        orch = self._make_orchestrator()
+    def test_delete_conversation(self, orch):
         conv = Conversation(user_id="u1")
         orch._conversations[conv.id] = conv
         assert orch.delete_conversation(conv.id) is True
         assert conv.id not in orch._conversations
 
-    def test_delete_nonexistent(self):
-        orch = self._make_orchestrator()
+    def test_delete_nonexistent(self, orch):
         assert orch.delete_conversation("nope") is False
 
-    def test_pin_conversation(self):
-        from agent.schemas import Conversation
-
-        orch = self._make_orchestrator()
+    def test_pin_conversation(self, orch):
         conv = Conversation(user_id="u1")
         orch._conversations[conv.id] = conv
         orch.pin_conversation(conv.id, pinned=True)
@@ -346,46 +272,39 @@ class TestOrchestrator:
         orch.pin_conversation(conv.id, pinned=False)
         assert conv.pinned is False
 
-    def test_archive_conversation(self):
-        from agent.schemas import Conversation
-
-        orch = self._make_orchestrator()
+    def test_archive_conversation(self, orch):
         conv = Conversation(user_id="u1")
         orch._conversations[conv.id] = conv
         orch.archive_conversation(conv.id, archived=True)
         assert conv.archived is True
 
-    def test_list_conversations_with_data(self):
-        from agent.schemas import Conversation
-
-        orch = self._make_orchestrator()
+    def test_list_conversations_with_data(self, orch):
         c1 = Conversation(user_id="u1", title="Chat A")
         c2 = Conversation(user_id="u1", title="Chat B")
         c3 = Conversation(user_id="u2", title="Other")
-        orch._conversations[c1.id] = c1
-        orch._conversations[c2.id] = c2
-        orch._conversations[c3.id] = c3
+        orch._conversations.update({c.id: c for c in (c1, c2, c3)})
         convs = orch.list_conversations("u1")
         assert len(convs) == 2
         titles = {c["title"] for c in convs}
         assert titles == {"Chat A", "Chat B"}
 
 
-class TestAgentAPI:
-    @pytest.fixture
-    def client(self):
-        from flask import Flask
+@pytest.fixture(scope="session")
+def agent_app():
+    """Flask app with the agent blueprint, built once per test session."""
+    app = Flask(__name__)
+    app.config["TESTING"] = True
+    app.register_blueprint(agent_bp)
+    return app
 
-        import agent.api as api_module
-        from agent.api import agent_bp
 
-        app = Flask(__name__)
-        app.config["TESTING"] = True
+class TestAgentAPI:
+    @pytest.fixture
+    def client(self, agent_app):
         api_module._orchestrator = None
         api_module._vector_mgr = None
         api_module._config = None
-        app.register_blueprint(agent_bp)
-        return app.test_client()
+        return agent_app.test_client()
 
     def test_health(self, client):
         resp = client.get("/api/agent/health")
@@ -446,8 +365,6 @@ class TestAgentAPI:
 
     @patch("agent.api._get_vector_mgr")
     def test_workspace_create(self, mock_mgr, client):
-        from agent.schemas import Workspace
-
         ws = Workspace(user_id="u1", name="test-ws", vector_store_id="vs_x")
         mock_mgr.return_value.create_workspace.return_value = ws
         resp = client.post(
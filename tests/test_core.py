@@ -6,11 +6,14 @@ input validation, rate limiting, and AI engine error handling.
 
 import importlib
 import os
+import subprocess
 import time
 from unittest.mock import MagicMock, patch
 
 import pytest
 
+from hackgpt import AIEngine, InputValidator, RateLimiter, _rate_limiter
+
 # ---------------------------------------------------------------------------
 # Import Tests
 # ---------------------------------------------------------------------------
@@ -33,22 +36,11 @@ class TestImports:
 
         assert EnterpriseHackGPT is not None
 
-    @pytest.mark.parametrize(
-        "module_name",
-        [
-            "database",
-            "ai_engine",
-            "security",
-            "exploitation",
-            "reporting",
-            "cloud",
-            "performance",
-        ],
-    )
-    def test_submodule_importable(self, module_name):
+    def test_all_submodules_importable(self):
         """Each sub-package should import without error."""
-        mod = importlib.import_module(module_name)
-        assert mod is not None
+        names = ["database", "ai_engine", "security", "exploitation", "reporting", "cloud", "performance"]
+        mods = [importlib.import_module(name) for name in names]
+        assert all(mod is not None for mod in mods)
 
     def test_version_attribute(self):
         """hackgpt.py should expose __version__."""
@@ -67,26 +59,17 @@ class TestImports:
 class TestConfigLoading:
     """Configuration should load safely with or without config.ini."""
 
-    def test_config_class_instantiates(self):
-        from hackgpt_v2 import Config
-
-        cfg = Config()
-        assert cfg is not None
-        assert hasattr(cfg, "DATABASE_URL")
-        assert hasattr(cfg, "SECRET_KEY")
+    def test_config_class_instantiates(self, enterprise_config):
+        assert enterprise_config is not None
+        assert hasattr(enterprise_config, "DATABASE_URL")
+        assert hasattr(enterprise_config, "SECRET_KEY")
 
-    def test_config_debug_default(self):
-        from hackgpt_v2 import Config
-
-        cfg = Config()
+    def test_config_debug_default(self, enterprise_config):
         # Production default should be False
-        assert cfg.DEBUG is False
-
-    def test_config_log_level_default(self):
-        from hackgpt_v2 import Config
+        assert enterprise_config.DEBUG is False
 
-        cfg = Config()
-        assert cfg.LOG_LEVEL in ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")
+    def test_config_log_level_default(self, enterprise_config):
+        assert enterprise_config.LOG_LEVEL in ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")
 
 
 # ---------------------------------------------------------------------------
@@ -97,71 +80,39 @@ class TestConfigLoading:
 class TestInputValidator:
     """InputValidator should reject malicious / oversized input."""
 
-    def test_valid_domain(self):
-        from hackgpt import InputValidator
-
+    def test_valid_domain_is_returned(self):
         ok, result = InputValidator.validate_target("example.com")
         assert ok is True
         assert result == "example.com"
 
-    def test_valid_ip(self):
-        from hackgpt import InputValidator
-
-        ok, _result = InputValidator.validate_target("192.168.1.1")
-        assert ok is True
-
-    def test_valid_cidr(self):
-        from hackgpt import InputValidator
-
-        ok, _result = InputValidator.validate_target("10.0.0.0/24")
-        assert ok is True
-
-    def test_empty_target(self):
-        from hackgpt import InputValidator
-
-        ok, _ = InputValidator.validate_target("")
-        assert ok is False
-
-    def test_whitespace_target(self):
-        from hackgpt import InputValidator
-
-        ok, _ = InputValidator.validate_target("   ")
-        assert ok is False
-
-    def test_too_long_target(self):
-        from hackgpt import InputValidator
-
-        ok, _ = InputValidator.validate_target("a" * 300)
-        assert ok is False
-
-    def test_invalid_chars_target(self):
-        from hackgpt import InputValidator
-
-        ok, _ = InputValidator.validate_target("example.com; rm -rf /")
-        assert ok is False
-
-    def test_sql_injection_target(self):
-        from hackgpt import InputValidator
-
-        ok, _ = InputValidator.validate_target("' OR 1=1 --")
-        assert ok is False
+    @pytest.mark.parametrize(
+        ("target", "expected"),
+        [
+            ("example.com", True),
+            ("192.168.1.1", True),
+            ("10.0.0.0/24", True),
+            ("", False),
+            ("   ", False),
+            ("a" * 300, False),
+            ("example.com; rm -rf /", False),
+            ("' OR 1=1 --", False),
+        ],
+        ids=["domain", "ip", "cidr", "empty", "whitespace", "too_long", "invalid_chars", "sql_injection"],
+    )
+    def test_validate_target(self, target, expected):
+        ok, _ = InputValidator.validate_target(target)
+        assert ok is expected
 
     def test_valid_scope(self):
-        from hackgpt import InputValidator
-
         ok, result = InputValidator.validate_scope("Web application testing")
         assert ok is True
         assert result == "Web application testing"
 
     def test_empty_scope(self):
-        from hackgpt import InputValidator
-
         ok, _ = InputValidator.validate_scope("")
         assert ok is False
 
     def test_too_long_scope(self):
-        from hackgpt import InputValidator
-
         ok, _ = InputValidator.validate_scope("x" * 501)
         assert ok is False
 
@@ -175,23 +126,17 @@ class TestRateLimiter:
     """RateLimiter should enforce request budgets."""
 
     def test_allows_within_limit(self):
-        from hackgpt import RateLimiter
-
         rl = RateLimiter(max_requests=5, window_seconds=60)
         for _ in range(5):
             assert rl.allow("test") is True
 
     def test_blocks_over_limit(self):
-        from hackgpt import RateLimiter
-
         rl = RateLimiter(max_requests=3, window_seconds=60)
         for _ in range(3):
             rl.allow("test")
         assert rl.allow("test") is False
 
     def test_independent_keys(self):
-        from hackgpt import RateLimiter
-
         rl = RateLimiter(max_requests=2, window_seconds=60)
         rl.allow("a")
         rl.allow("a")
@@ -207,45 +152,40 @@ class TestRateLimiter:
 class TestAIEngine:
     """AIEngine should instantiate without crashing."""
 
+    @pytest.fixture(autouse=True)
+    def _isolate_rate_limiter(self):
+        """Snapshot and restore the module-global limiter around each test."""
+        snapshot = {key: list(stamps) for key, stamps in _rate_limiter._timestamps.items()}
+        yield
+        _rate_limiter._timestamps.clear()
+        _rate_limiter._timestamps.update(snapshot)
+
     @patch("hackgpt.subprocess.run")
     def test_ai_engine_local_mode(self, mock_run):
         """Without OPENAI_API_KEY, AIEngine falls back to local mode."""
         mock_run.return_value = MagicMock(returncode=0, stdout="", stderr="")
         old_key = os.environ.pop("OPENAI_API_KEY", None)
         try:
-            from hackgpt import AIEngine
-
             ai = AIEngine()
             assert ai.local_mode is True
         finally:
             if old_key is not None:
                 os.environ["OPENAI_API_KEY"] = old_key
 
-    @patch("hackgpt.subprocess.run")
-    def test_ai_engine_creates_prompt(self, mock_run):
+    def test_ai_engine_creates_prompt(self, ai_engine):
         """Prompt creation should return a non-empty string."""
-        mock_run.return_value = MagicMock(returncode=0, stdout="", stderr="")
-        from hackgpt import AIEngine
-
-        ai = AIEngine()
-        prompt = ai._create_prompt("test context", "test data", "recon")
+        prompt = ai_engine._create_prompt("test context", "test data", "recon")
         assert isinstance(prompt, str)
         assert "test context" in prompt
         assert "test data" in prompt
 
-    @patch("hackgpt.subprocess.run")
-    def test_ai_engine_rate_limited(self, mock_run):
+    def test_ai_engine_rate_limited(self, ai_engine):
         """analyze() should respect the rate limiter."""
-        mock_run.return_value = MagicMock(returncode=0, stdout="ok", stderr="")
-        from hackgpt import AIEngine, _rate_limiter
-
-        ai = AIEngine()
         # Exhaust rate limit
-        _rate_limiter._timestamps["ai_analyze"] = [time.monotonic() for _ in range(30)]
-        result = ai.analyze("ctx", "data", "test")
+        now = time.monotonic()
+        _rate_limiter._timestamps["ai_analyze"] = [now] * 30
+        result = ai_engine.analyze("ctx", "data", "test")
         assert "Rate limit" in result
-        # Cleanup
-        _rate_limiter._timestamps.pop("ai_analyze", None)
 
 
 # ---------------------------------------------------------------------------
@@ -256,43 +196,30 @@ class TestAIEngine:
 class TestToolManager:
     """ToolManager should instantiate and report tool status."""
 
-    def test_tool_manager_instantiates(self):
-        from hackgpt import ToolManager
-
-        tm = ToolManager()
-        assert tm is not None
-        assert isinstance(tm.installed_tools, set)
+    def test_tool_manager_instantiates(self, tool_manager):
+        assert tool_manager is not None
+        assert isinstance(tool_manager.installed_tools, set)
 
-    def test_check_tool_returns_bool(self):
-        from hackgpt import ToolManager
-
-        tm = ToolManager()
+    def test_check_tool_returns_bool(self, tool_manager):
         # 'python3' should be available in the test environment
-        result = tm.check_tool("python3")
+        result = tool_manager.check_tool("python3")
         assert isinstance(result, bool)
 
-    def test_run_command_returns_dict(self):
-        from hackgpt import ToolManager
-
-        tm = ToolManager()
-        result = tm.run_command("echo hello")
+    def test_run_command_returns_dict(self, tool_manager):
+        result = tool_manager.run_command("echo hello")
         assert isinstance(result, dict)
         assert result["success"] is True
         assert "hello" in result["stdout"]
 
-    def test_run_command_timeout(self):
-        from hackgpt import ToolManager
-
-        tm = ToolManager()
-        result = tm.run_command("sleep 10", timeout=1)
+    @patch("hackgpt.subprocess.run", side_effect=subprocess.TimeoutExpired(cmd="sleep 10", timeout=1))
+    def test_run_command_timeout(self, mock_run, tool_manager):
+        result = tool_manager.run_command("sleep 10", timeout=1)
+        mock_run.assert_called_once()
         assert result["success"] is False
         assert "timed out" in result["stderr"].lower()
 
-    def test_run_command_with_pipe(self):
-        from hackgpt import ToolManager
-
-        tm = ToolManager()
-        result = tm.run_command("echo hello | tr a-z A-Z")
+    def test_run_command_with_pipe(self, tool_manager):
+        result = tool_manager.run_command("echo hello | tr a-z A-Z")
         assert result["success"] is True
         assert "HELLO" in result["stdout"]
 
@@ -305,28 +232,13 @@ class TestToolManager:
 class TestHackGPTClass:
     """Top-level HackGPT class instantiation."""
 
-    @patch("hackgpt.subprocess.run")
-    def test_hackgpt_instantiates(self, mock_run):
-        mock_run.return_value = MagicMock(returncode=0, stdout="", stderr="")
-        from hackgpt import HackGPT
+    def test_hackgpt_instantiates(self, hackgpt_instance):
+        assert hackgpt_instance is not None
+        assert hasattr(hackgpt_instance, "ai_engine")
+        assert hasattr(hackgpt_instance, "tool_manager")
 
-        hgpt = HackGPT()
-        assert hgpt is not None
-        assert hasattr(hgpt, "ai_engine")
-        assert hasattr(hgpt, "tool_manager")
-
-    @patch("hackgpt.subprocess.run")
-    def test_hackgpt_has_show_banner(self, mock_run):
-        mock_run.return_value = MagicMock(returncode=0, stdout="", stderr="")
-        from hackgpt import HackGPT
-
-        hgpt = HackGPT()
-        assert callable(getattr(hgpt, "show_banner", None))
-
-    @patch("hackgpt.subprocess.run")
-    def test_hackgpt_has_show_menu(self, mock_run):
-        mock_run.return_value = MagicMock(returncode=0, stdout="", stderr="")
-        from hackgpt import HackGPT
+    def test_hackgpt_has_show_banner(self, hackgpt_instance):
+        assert callable(getattr(hackgpt_instance, "show_banner", None))
 
-        hgpt = HackGPT()
-        assert callable(getattr(hgpt, "show_menu", None))
+    def test_hackgpt_has_show_menu(self, hackgpt_instance):
+        assert callable(getattr(hackgpt_instance, "show_menu", None))
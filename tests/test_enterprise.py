@@ -5,8 +5,72 @@ reporting engine, and security/authentication modules.
 """
 
 import importlib
+import importlib.util
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 from unittest.mock import patch
 
+import pytest
+
+import database
+import performance.performance_monitor as pm_module
+import reporting
+from ai_engine.advanced_engine import AdvancedAIEngine
+from cloud.service_registry import ServiceInstance, ServiceRegistry
+from database import models
+from database.models import Base
+from hackgpt import __version__
+from hackgpt_v2 import Config, EnterpriseHackGPT
+from performance import cache_manager
+from performance.cache_manager import CacheManager
+from performance.performance_monitor import PerformanceMonitor
+from security.authentication import LocalAuthenticator
+from security.filesystem import UnrestrictedFileSystem
+
+_SEMVER = re.compile(r"^\d+\.\d+\.\d+$")
+
+_EXPECTED_DB_EXPORTS = frozenset(
+    {
+        "AIContext",
+        "AttackChain",
+        "AuditLog",
+        "Base",
+        "Configuration",
+        "DatabaseManager",
+        "PentestSession",
+        "PhaseResult",
+        "User",
+        "Vulnerability",
+        "get_db_manager",
+        "init_database",
+    }
+)
+
+
+def _has_module(name):
+    return importlib.util.find_spec(name) is not None
+
+
+def _pid_alive(pid):
+    """True if *pid* is running; killed-but-unreaped zombies count as dead."""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().rsplit(")", 1)[1].split()[0] != "Z"
+    except FileNotFoundError:
+        return False
+    except OSError:
+        return True
+
+
 # ---------------------------------------------------------------------------
 # Database Models
 # ---------------------------------------------------------------------------
@@ -16,81 +80,31 @@ class TestDatabaseModels:
     """Verify database models can be instantiated and have correct fields."""
 
     def test_base_model_exists(self):
-        from database.models import Base
-
         assert Base is not None
 
-    def test_pentest_session_model(self):
-        from database.models import PentestSession
-
-        assert hasattr(PentestSession, "__tablename__")
-        assert PentestSession.__tablename__ == "pentest_sessions"
-
-    def test_vulnerability_model(self):
-        from database.models import Vulnerability
-
-        assert hasattr(Vulnerability, "__tablename__")
-        assert Vulnerability.__tablename__ == "vulnerabilities"
-
-    def test_user_model(self):
-        from database.models import User
-
-        assert hasattr(User, "__tablename__")
-        assert User.__tablename__ == "users"
-
-    def test_audit_log_model(self):
-        from database.models import AuditLog
-
-        assert hasattr(AuditLog, "__tablename__")
-        assert AuditLog.__tablename__ == "audit_logs"
-
-    def test_configuration_model(self):
-        from database.models import Configuration
-
-        assert hasattr(Configuration, "__tablename__")
-        assert Configuration.__tablename__ == "configurations"
-
-    def test_ai_context_model(self):
-        from database.models import AIContext
-
-        assert hasattr(AIContext, "__tablename__")
-        assert AIContext.__tablename__ == "ai_contexts"
-
-    def test_phase_result_model(self):
-        from database.models import PhaseResult
-
-        assert hasattr(PhaseResult, "__tablename__")
-        assert PhaseResult.__tablename__ == "phase_results"
-
-    def test_attack_chain_model(self):
-        from database.models import AttackChain
-
-        assert hasattr(AttackChain, "__tablename__")
-        assert AttackChain.__tablename__ == "attack_chains"
+    @pytest.mark.parametrize(
+        ("name", "table"),
+        [
+            ("PentestSession", "pentest_sessions"),
+            ("Vulnerability", "vulnerabilities"),
+            ("User", "users"),
+            ("AuditLog", "audit_logs"),
+            ("Configuration", "configurations"),
+            ("AIContext", "ai_contexts"),
+            ("PhaseResult", "phase_results"),
+            ("AttackChain", "attack_chains"),
+        ],
+    )
+    def test_model_tablename(self, name, table):
+        assert getattr(models, name).__tablename__ == table
 
 
 class TestDatabaseInit:
     """Database __init__ should export all public models."""
 
     def test_all_exports_present(self):
-        import database
-
-        expected = [
-            "AIContext",
-            "AttackChain",
-            "AuditLog",
-            "Base",
-            "Configuration",
-            "DatabaseManager",
-            "PentestSession",
-            "PhaseResult",
-            "User",
-            "Vulnerability",
-            "get_db_manager",
-            "init_database",
-        ]
-        for name in expected:
-            assert hasattr(database, name), f"database module missing export: {name}"
+        missing = _EXPECTED_DB_EXPORTS - set(dir(database))
+        assert not missing, f"database module missing exports: {sorted(missing)}"
 
 
 # ---------------------------------------------------------------------------
@@ -101,59 +115,158 @@ class TestDatabaseInit:
 class TestPerformanceModule:
     """Performance subsystem imports and basic instantiation."""
 
-    def test_cache_manager_importable(self):
-        from performance.cache_manager import CacheManager
-
-        assert CacheManager is not None
+    @pytest.mark.parametrize(
+        ("module", "name"),
+        [
+            ("performance.cache_manager", "CacheManager"),
+            ("performance.performance_monitor", "PerformanceMonitor"),
+            ("performance.load_balancer", "LoadBalancer"),
+            ("performance.optimization", "QueryOptimizer"),
+            ("performance.optimization", "ResourceOptimizer"),
+        ],
+    )
+    def test_importable(self, module, name):
+        assert getattr(importlib.import_module(module), name) is not None
 
     def test_cache_manager_instantiates(self):
-        from performance.cache_manager import CacheManager
-
         cm = CacheManager()
         assert cm is not None
 
-    def test_performance_monitor_importable(self):
-        from performance.performance_monitor import PerformanceMonitor
+    def test_redis_flag_matches_environment(self):
+        assert cache_manager.REDIS_AVAILABLE is _has_module("redis")
+
+
+class TestPerformanceMonitor:
+    """PerformanceMonitor metric bookkeeping."""
+
+    def test_add_metrics_tracks_latest_value(self):
+        pm = PerformanceMonitor()
+        now = datetime.now(tz=timezone.utc)
+        pm._add_metrics([pm._make_metric("cpu_usage_percent", 10.0, "%", now, "system")])
+        pm._add_metrics([pm._make_metric("cpu_usage_percent", 42.0, "%", now, "system")])
+
+        assert len(pm.metrics) == 2
+        assert pm.get_current_metrics()["cpu_usage_percent"]["value"] == 42.0
+
+    @patch("performance.performance_monitor.psutil.disk_usage", side_effect=OSError("no disk"))
+    @patch("performance.performance_monitor.psutil.cpu_percent", return_value=12.0)
+    def test_collect_keeps_samples_taken_before_a_failure(self, mock_cpu, mock_disk):
+        pm = PerformanceMonitor()
+        with pytest.raises(OSError, match="no disk"):
+            pm._collect_system_metrics()
+        mock_disk.assert_called_once_with("/")
+
+        current = pm.get_current_metrics()
+        assert current["cpu_usage_percent"]["value"] == mock_cpu.return_value
+        assert "memory_usage_percent" in current
+        assert "disk_usage_percent" not in current
+
+    def test_add_metrics_trims_history(self):
+        pm = PerformanceMonitor()
+        pm.max_metrics = 5
+        now = datetime.now(tz=timezone.utc)
+        pm._add_metrics([pm._make_metric(f"m{i}", float(i), "count", now) for i in range(8)])
+
+        assert [m.name for m in pm.metrics] == ["m3", "m4", "m5", "m6", "m7"]
+
+    def test_adaptive_interval_backs_off_when_idle(self):
+        pm = PerformanceMonitor(collection_interval=5, max_collection_interval=30)
+        now = datetime.now(tz=timezone.utc)
+
+        def sample(cpu, memory):
+            pm._add_metrics(
+                [
+                    pm._make_metric("cpu_usage_percent", cpu, "%", now, "system"),
+                    pm._make_metric("memory_usage_percent", memory, "%", now, "system"),
+                ]
+            )
+            pm._adapt_interval()
+
+        for _ in range(4):
+            sample(10.0, 50.0)
+        assert pm._current_interval == 10
+
+        for _ in range(3):
+            sample(10.5, 50.5)
+        assert pm._current_interval == 30
+
+        sample(60.0, 50.0)
+        assert pm._current_interval == 5
+
+    @patch("performance.performance_monitor.Thread")
+    def test_restart_forgets_previous_usage(self, mock_thread):
+        pm = PerformanceMonitor(collection_interval=5)
+        pm._previous_usage = (50.0, 50.0)
+        pm._current_interval = 40
+
+        pm.start_monitoring()
+
+        mock_thread.return_value.start.assert_called_once()
+        assert pm._previous_usage is None
+        assert pm._current_interval == 5
+
+    def test_summary_and_alerts_read_latest_values(self):
+        pm = PerformanceMonitor()
+        now = datetime.now(tz=timezone.utc)
+        pm._add_metrics(
+            [
+                pm._make_metric("cpu_usage_percent", 95.0, "%", now, "system"),
+                pm._make_metric("memory_usage_percent", 82.0, "%", now, "system"),
+            ]
+        )
 
-        assert PerformanceMonitor is not None
+        summary = pm.get_system_summary()
+        assert summary["system"]["cpu_usage"] == 95.0
+        assert summary["system"]["disk_usage"] == 0
+        alerts = {a["metric"]: a["type"] for a in pm.get_alerts()}
+        assert alerts == {"cpu_usage": "critical", "memory_usage": "warning"}
 
-    def test_load_balancer_importable(self):
-        from performance.load_balancer import LoadBalancer
+    @patch.object(pm_module, "_performance_monitor", None)
+    @patch.object(pm_module, "PerformanceMonitor")
+    def test_singleton_is_shared_across_threads(self, ctor):
+        workers = 8
+        start = threading.Barrier(workers)
 
-        assert LoadBalancer is not None
+        def slow_monitor():
+            # Hold the cold path open long enough for every thread to reach it
+            time.sleep(0.05)
+            return object()
 
-    def test_optimization_importable(self):
-        from performance.optimization import QueryOptimizer, ResourceOptimizer
+        def get_monitor(_):
+            start.wait()
+            return pm_module.get_performance_monitor()
 
-        assert QueryOptimizer is not None
-        assert ResourceOptimizer is not None
+        ctor.side_effect = slow_monitor
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            monitors = list(pool.map(get_monitor, range(workers)))
+
+        ctor.assert_called_once_with()
+        assert len({id(m) for m in monitors}) == 1
 
 
 class TestCacheManagerOperations:
     """CacheManager basic get/set operations."""
 
-    def test_memory_cache_set_get(self):
-        from performance.cache_manager import CacheManager
-
-        cm = CacheManager()
-        cm.set("test_key", "test_value", l1_ttl=60)
-        result = cm.get("test_key")
-        assert result == "test_value"
+    @pytest.fixture(scope="class")
+    def cm(self):
+        return CacheManager()
 
-    def test_memory_cache_missing_key(self):
-        from performance.cache_manager import CacheManager
+    @pytest.fixture
+    def key(self, request):
+        """Per-test cache key so tests sharing ``cm`` don't see each other's entries."""
+        return request.node.name
 
-        cm = CacheManager()
-        result = cm.get("nonexistent_key_xyz")
-        assert result is None
+    def test_memory_cache_set_get(self, cm, key):
+        cm.set(key, "test_value", l1_ttl=60)
+        assert cm.get(key) == "test_value"
 
-    def test_memory_cache_delete(self):
-        from performance.cache_manager import CacheManager
+    def test_memory_cache_missing_key(self, cm, key):
+        assert cm.get(key) is None
 
-        cm = CacheManager()
-        cm.set("del_key", "value")
-        cm.delete("del_key")
-        assert cm.get("del_key") is None
+    def test_memory_cache_delete(self, cm, key):
+        cm.set(key, "value")
+        cm.delete(key)
+        assert cm.get(key) is None
 
 
 # ---------------------------------------------------------------------------
@@ -164,39 +277,38 @@ class TestCacheManagerOperations:
 class TestCloudModule:
     """Cloud subsystem module imports."""
 
-    def test_docker_manager_importable(self):
-        from cloud.docker_manager import DockerManager
-
-        assert DockerManager is not None
-
-    def test_kubernetes_manager_importable(self):
-        from cloud.kubernetes_manager import KubernetesManager
-
-        assert KubernetesManager is not None
-
-    def test_service_registry_importable(self):
-        from cloud.service_registry import ServiceRegistry
-
-        assert ServiceRegistry is not None
-
-    def test_load_balancer_importable(self):
-        from cloud.load_balancer import LoadBalancer
-
-        assert LoadBalancer is not None
+    @pytest.mark.parametrize(
+        ("module", "name"),
+        [
+            ("cloud.docker_manager", "DockerManager"),
+            ("cloud.kubernetes_manager", "KubernetesManager"),
+            ("cloud.service_registry", "ServiceRegistry"),
+            ("cloud.load_balancer", "LoadBalancer"),
+        ],
+    )
+    def test_importable(self, module, name):
+        assert getattr(importlib.import_module(module), name) is not None
+
+    @pytest.mark.parametrize(
+        ("module", "flag", "sdk"),
+        [
+            ("cloud.docker_manager", "DOCKER_AVAILABLE", "docker"),
+            ("cloud.kubernetes_manager", "KUBERNETES_AVAILABLE", "kubernetes"),
+        ],
+    )
+    def test_sdk_flag_matches_environment(self, module, flag, sdk):
+        """The managers import without their SDK and report whether it is present."""
+        assert getattr(importlib.import_module(module), flag) is _has_module(sdk)
 
 
 class TestServiceRegistry:
     """ServiceRegistry basic operations with memory backend."""
 
     def test_memory_registry_instantiates(self):
-        from cloud.service_registry import ServiceRegistry
-
         sr = ServiceRegistry(backend="memory")
         assert sr is not None
 
     def test_register_service(self):
-        from cloud.service_registry import ServiceInstance, ServiceRegistry
-
         sr = ServiceRegistry(backend="memory")
         svc = ServiceInstance(
             service_name="test-svc",
@@ -208,8 +320,6 @@ class TestServiceRegistry:
         assert result is True
 
     def test_discover_registered_service(self):
-        from cloud.service_registry import ServiceInstance, ServiceRegistry
-
         sr = ServiceRegistry(backend="memory")
         svc = ServiceInstance(
             service_name="my-svc",
@@ -222,8 +332,6 @@ class TestServiceRegistry:
         assert len(instances) > 0
 
     def test_deregister_service(self):
-        from cloud.service_registry import ServiceInstance, ServiceRegistry
-
         sr = ServiceRegistry(backend="memory")
         svc = ServiceInstance(
             service_name="rm-svc",
@@ -245,13 +353,24 @@ class TestServiceRegistry:
 class TestReportingModule:
     """Reporting module imports and instantiation."""
 
-    def test_dynamic_reports_importable(self):
-        mod = importlib.import_module("reporting.dynamic_reports")
-        assert hasattr(mod, "DynamicReportGenerator")
-
-    def test_realtime_dashboard_importable(self):
-        mod = importlib.import_module("reporting.realtime_dashboard")
-        assert mod is not None
+    @pytest.mark.parametrize(
+        ("module", "name"),
+        [
+            ("reporting.dynamic_reports", "DynamicReportGenerator"),
+            ("reporting.realtime_dashboard", "RealTimeDashboard"),
+        ],
+    )
+    def test_importable(self, module, name):
+        assert hasattr(importlib.import_module(module), name)
+
+    def test_realtime_dashboard_is_cached(self):
+        reporting.get_realtime_dashboard.cache_clear()
+        try:
+            with patch("reporting.realtime_dashboard.get_db_manager"):
+                first = reporting.get_realtime_dashboard()
+                assert reporting.get_realtime_dashboard() is first
+        finally:
+            reporting.get_realtime_dashboard.cache_clear()
 
 
 # ---------------------------------------------------------------------------
@@ -262,26 +381,78 @@ class TestReportingModule:
 class TestSecurityModule:
     """Security module imports and basic auth operations."""
 
-    def test_auth_module_importable(self):
-        from security.authentication import EnterpriseAuth, LocalAuthenticator
-
-        assert EnterpriseAuth is not None
-        assert LocalAuthenticator is not None
-
-    def test_compliance_module_importable(self):
-        from security.compliance import ComplianceFrameworkMapper
-
-        assert ComplianceFrameworkMapper is not None
+    @pytest.mark.parametrize(
+        ("module", "name"),
+        [
+            ("security.authentication", "EnterpriseAuth"),
+            ("security.authentication", "LocalAuthenticator"),
+            ("security.compliance", "ComplianceFrameworkMapper"),
+        ],
+    )
+    def test_importable(self, module, name):
+        assert getattr(importlib.import_module(module), name) is not None
 
     def test_local_authenticator_instantiates(self):
-
-        from security.authentication import LocalAuthenticator
-
         with patch("security.authentication.get_db_manager"):
             auth = LocalAuthenticator()
             assert auth is not None
             assert hasattr(auth, "authenticate")
 
+    def test_file_info_is_json_serializable(self, tmp_path):
+        target = tmp_path / "sample.txt"
+        target.write_text("data")
+        info = UnrestrictedFileSystem().get_file_info(target)
+
+        assert info["exists"] is True
+        assert info["is_file"] is True
+        assert info["is_dir"] is False
+        assert info["size"] == 4
+        json.dumps(info)
+
+    def test_file_info_missing_path(self, tmp_path):
+        assert UnrestrictedFileSystem().get_file_info(tmp_path / "missing") == {"exists": False}
+
+    def test_file_info_path_through_a_file(self, tmp_path):
+        parent = tmp_path / "file.txt"
+        parent.write_text("data")
+        # ENOTDIR rather than ENOENT
+        assert UnrestrictedFileSystem().get_file_info(parent / "child") == {"exists": False}
+
+    def test_file_info_path_with_nul_byte(self):
+        assert UnrestrictedFileSystem().get_file_info("a\x00b") == {"exists": False}
+
+    def test_execute_command_returns_stdout(self):
+        fs = UnrestrictedFileSystem()
+        assert fs.execute_command("echo one; echo two") == "one\ntwo\n"
+        with pytest.raises(RuntimeError, match="boom"):
+            fs.execute_command("echo boom >&2; exit 3")
+
+    def test_execute_command_stream_yields_lines(self):
+        fs = UnrestrictedFileSystem()
+        assert list(fs.execute_command_stream("echo one; echo two")) == ["one\n", "two\n"]
+        with pytest.raises(RuntimeError, match="boom"):
+            list(fs.execute_command_stream("echo boom >&2; exit 3"))
+
+    def test_execute_command_stream_stops_early(self, tmp_path):
+        pid_file = tmp_path / "pids"
+        stream = UnrestrictedFileSystem().execute_command_stream(
+            f"echo $$ > {pid_file}; sleep 41 & echo $! >> {pid_file}; echo first; wait; echo second"
+        )
+        start = time.monotonic()
+        for line in stream:
+            assert line == "first\n"
+            break
+        stream.close()
+        assert time.monotonic() - start < 2
+
+        # Both the shell and the tool it launched must be gone, not orphaned
+        pids = [int(pid) for pid in pid_file.read_text().split()]
+        assert len(pids) == 2
+        deadline = time.monotonic() + 2
+        while any(_pid_alive(pid) for pid in pids) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert not any(_pid_alive(pid) for pid in pids), pids
+
 
 # ---------------------------------------------------------------------------
 # Exploitation Module
@@ -291,15 +462,15 @@ class TestSecurityModule:
 class TestExploitationModule:
     """Exploitation subsystem imports."""
 
-    def test_advanced_engine_importable(self):
-        from exploitation.advanced_engine import AdvancedExploitationEngine
-
-        assert AdvancedExploitationEngine is not None
-
-    def test_zero_day_detector_importable(self):
-        from exploitation.zero_day_detector import ZeroDayDetector
-
-        assert ZeroDayDetector is not None
+    @pytest.mark.parametrize(
+        ("module", "name"),
+        [
+            ("exploitation.advanced_engine", "AdvancedExploitationEngine"),
+            ("exploitation.zero_day_detector", "ZeroDayDetector"),
+        ],
+    )
+    def test_importable(self, module, name):
+        assert getattr(importlib.import_module(module), name) is not None
 
 
 # ---------------------------------------------------------------------------
@@ -311,8 +482,6 @@ class TestAIEngineModule:
     """AI engine advanced module."""
 
     def test_advanced_engine_importable(self):
-        from ai_engine.advanced_engine import AdvancedAIEngine
-
         assert AdvancedAIEngine is not None
 
 
@@ -325,8 +494,6 @@ class TestEnterpriseHackGPT:
     """Enterprise version instantiation and configuration."""
 
     def test_enterprise_config(self):
-        from hackgpt_v2 import Config
-
         cfg = Config()
         assert hasattr(cfg, "DATABASE_URL")
         assert hasattr(cfg, "REDIS_URL")
@@ -336,15 +503,9 @@ class TestEnterpriseHackGPT:
 
     def test_enterprise_has_all_features(self):
         """EnterpriseHackGPT should have key enterprise methods."""
-        from hackgpt_v2 import EnterpriseHackGPT
-
         assert hasattr(EnterpriseHackGPT, "run")
         assert hasattr(EnterpriseHackGPT, "show_banner")
 
     def test_version_string_format(self):
         """Version should follow semver."""
-        from hackgpt import __version__
-
-        parts = __version__.split(".")
-        assert len(parts) == 3
-        assert all(p.isdigit() for p in parts)
+        assert _SEMVER.match(__version__), __version__
